@@ -0,0 +1,75 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.config import get_settings
+from app.database import Base, create_db_engine
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+
+config = context.config
+settings = get_settings()
+
+if config.config_file_name is not None and config.attributes.get("configure_logging", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Full-text search tables (migration 0006) are managed by hand: an FTS5
+# virtual table and its shadow tables on SQLite, a tsvector table on PostgreSQL
+SEARCH_TABLES = ("search_index", "search_documents")
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    """Keep autogenerate / `alembic check` away from the search tables"""
+    if type_ == "table" and name is not None and name.startswith(SEARCH_TABLES):
+        return False
+    return True
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL for DATABASE_URL without connecting (alembic upgrade --sql)"""
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+        include_object=include_object,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Run migrations against DATABASE_URL"""
+    engine = create_db_engine(settings.DATABASE_URL)
+    try:
+        with engine.connect() as connection:
+            if connection.dialect.name == "sqlite":
+                # Batch mode rebuilds SQLite tables by copy-and-drop; with foreign keys
+                # enforced, dropping a parent table would cascade-delete its children
+                connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+                connection.commit()
+            _run(connection)
+    finally:
+        engine.dispose()
+
+
+def _run(connection) -> None:
+    # Batch mode lets SQLite alter tables (e.g. add a constraint) by copying them
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=True,
+        include_object=include_object,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,158 @@
+"""app tables and hot path indexes
+
+Tables added after the initial schema: the AI response cache, AI usage
+records and generation jobs. Indexes for the foreign keys every request
+filters on, projects in listing order, sections in position order, and
+one feedback row per (section, user).
+
+Already covered by existing indexes, so not added again:
+projects.user_id (leading column of ix_projects_user_updated),
+sections.project_id (ix_sections_project_position) and
+feedback.section_id (uq_feedback_section_user).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 04:33:04.275548
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('ai_cache_entries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cache_key', sa.String(), nullable=False),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('response_text', sa.Text(), nullable=False),
+    sa.Column('hit_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_accessed_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('ai_cache_entries', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_ai_cache_entries_cache_key'), ['cache_key'], unique=True)
+        batch_op.create_index(batch_op.f('ix_ai_cache_entries_expires_at'), ['expires_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_ai_cache_entries_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_ai_cache_entries_last_accessed_at'), ['last_accessed_at'], unique=False)
+
+    op.create_table('ai_usage_records',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('project_id', sa.Integer(), nullable=True),
+    sa.Column('operation', sa.String(), nullable=False),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('prompt_tokens', sa.Integer(), nullable=True),
+    sa.Column('completion_tokens', sa.Integer(), nullable=True),
+    sa.Column('latency_ms', sa.Integer(), nullable=False),
+    sa.Column('outcome', sa.String(), nullable=False),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.CheckConstraint("outcome IN ('success', 'error')", name='check_usage_outcome'),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('ai_usage_records', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_ai_usage_records_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_ai_usage_records_project_id'), ['project_id'], unique=False)
+        batch_op.create_index('ix_ai_usage_records_user_created', ['user_id', 'created_at'], unique=False)
+
+    op.create_table('generation_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=True),
+    sa.Column('job_type', sa.String(), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('progress', sa.Integer(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('result', sa.Text(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('run_after', sa.DateTime(), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.CheckConstraint("job_type IN ('generate_section', 'refine_section', 'generate_all')", name='check_job_type'),
+    sa.CheckConstraint("status IN ('queued', 'running', 'succeeded', 'failed')", name='check_job_status'),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('generation_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_generation_jobs_id'), ['id'], unique=False)
+        batch_op.create_index('ix_generation_jobs_status_run_after', ['status', 'run_after'], unique=False)
+        batch_op.create_index(batch_op.f('ix_generation_jobs_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.create_index('ix_projects_user_updated', ['user_id', 'updated_at', 'id'], unique=False)
+
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_comments_section_id'), ['section_id'], unique=False)
+
+    # Feedback was upserted with a racy select-then-insert; keep the newest vote of any duplicates
+    op.execute(
+        "DELETE FROM feedback WHERE id NOT IN ("
+        "SELECT MAX(id) FROM feedback GROUP BY section_id, user_id)"
+    )
+    with op.batch_alter_table('feedback', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_feedback_user_id'), ['user_id'], unique=False)
+        batch_op.create_unique_constraint('uq_feedback_section_user', ['section_id', 'user_id'])
+
+    with op.batch_alter_table('refinements', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_refinements_section_id'), ['section_id'], unique=False)
+
+    with op.batch_alter_table('sections', schema=None) as batch_op:
+        batch_op.create_index('ix_sections_project_position', ['project_id', 'position'], unique=False)
+
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('sections', schema=None) as batch_op:
+        batch_op.drop_index('ix_sections_project_position')
+
+    with op.batch_alter_table('refinements', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_refinements_section_id'))
+
+    with op.batch_alter_table('feedback', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_feedback_section_user', type_='unique')
+        batch_op.drop_index(batch_op.f('ix_feedback_user_id'))
+
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_comments_section_id'))
+
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_index('ix_projects_user_updated')
+
+    with op.batch_alter_table('generation_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_generation_jobs_user_id'))
+        batch_op.drop_index('ix_generation_jobs_status_run_after')
+        batch_op.drop_index(batch_op.f('ix_generation_jobs_id'))
+
+    op.drop_table('generation_jobs')
+    with op.batch_alter_table('ai_usage_records', schema=None) as batch_op:
+        batch_op.drop_index('ix_ai_usage_records_user_created')
+        batch_op.drop_index(batch_op.f('ix_ai_usage_records_project_id'))
+        batch_op.drop_index(batch_op.f('ix_ai_usage_records_id'))
+
+    op.drop_table('ai_usage_records')
+    with op.batch_alter_table('ai_cache_entries', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_ai_cache_entries_last_accessed_at'))
+        batch_op.drop_index(batch_op.f('ix_ai_cache_entries_id'))
+        batch_op.drop_index(batch_op.f('ix_ai_cache_entries_expires_at'))
+        batch_op.drop_index(batch_op.f('ix_ai_cache_entries_cache_key'))
+
+    op.drop_table('ai_cache_entries')
+
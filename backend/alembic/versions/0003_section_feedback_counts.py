@@ -0,0 +1,41 @@
+"""section feedback counts
+
+Per-section like/dislike totals, backfilled from existing feedback.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 04:37:45.194086
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('section_feedback_counts',
+    sa.Column('section_id', sa.Integer(), nullable=False),
+    sa.Column('like_count', sa.Integer(), nullable=False),
+    sa.Column('dislike_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['section_id'], ['sections.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('section_id')
+    )
+    op.execute(
+        "INSERT INTO section_feedback_counts (section_id, like_count, dislike_count) "
+        "SELECT section_id, "
+        "SUM(CASE WHEN feedback_type = 'like' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN feedback_type = 'dislike' THEN 1 ELSE 0 END) "
+        "FROM feedback GROUP BY section_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('section_feedback_counts')
@@ -0,0 +1,114 @@
+"""compressed refinements
+
+Refinement bodies are stored zlib-compressed (refined_content ->
+refined_content_z), and old refinements can be moved to refinement_archives.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 05:12:09.418302
+
+"""
+import json
+import zlib
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+refinements = sa.table(
+    'refinements',
+    sa.column('id', sa.Integer()),
+    sa.column('section_id', sa.Integer()),
+    sa.column('refinement_prompt', sa.Text()),
+    sa.column('refined_content', sa.Text()),
+    sa.column('refined_content_z', sa.LargeBinary()),
+    sa.column('created_at', sa.DateTime()),
+)
+
+
+def _convert(source, target, convert) -> None:
+    """Fill ``target`` from ``source`` in id order, a batch at a time"""
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(refinements.c.id, source)
+            .where(refinements.c.id > last_id)
+            .order_by(refinements.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        connection.execute(
+            refinements.update()
+            .where(refinements.c.id == sa.bindparam('row_id'))
+            .values({target.name: sa.bindparam('value')}),
+            [{'row_id': row_id, 'value': convert(value)} for row_id, value in rows]
+        )
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    op.create_table('refinement_archives',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('section_id', sa.Integer(), nullable=False),
+    sa.Column('first_refinement_id', sa.Integer(), nullable=False),
+    sa.Column('last_refinement_id', sa.Integer(), nullable=False),
+    sa.Column('refinement_count', sa.Integer(), nullable=False),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['section_id'], ['sections.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_refinement_archives_section_last', 'refinement_archives', ['section_id', 'last_refinement_id'], unique=False)
+    op.create_index(op.f('ix_refinement_archives_id'), 'refinement_archives', ['id'], unique=False)
+
+    op.add_column('refinements', sa.Column('refined_content_z', sa.LargeBinary(), nullable=True))
+    _convert(refinements.c.refined_content, refinements.c.refined_content_z,
+             lambda text: zlib.compress(text.encode('utf-8')))
+    with op.batch_alter_table('refinements', schema=None) as batch_op:
+        batch_op.alter_column('refined_content_z', existing_type=sa.LargeBinary(), nullable=False)
+        batch_op.drop_column('refined_content')
+        batch_op.create_index(batch_op.f('ix_refinements_created_at'), ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.add_column('refinements', sa.Column('refined_content', sa.Text(), nullable=True))
+    _convert(refinements.c.refined_content_z, refinements.c.refined_content,
+             lambda data: zlib.decompress(data).decode('utf-8'))
+
+    # Put archived refinements back, with their original ids
+    connection = op.get_bind()
+    archives = sa.table('refinement_archives', sa.column('section_id', sa.Integer()), sa.column('payload', sa.LargeBinary()))
+    for section_id, payload in connection.execute(sa.select(archives.c.section_id, archives.c.payload)).all():
+        entries = json.loads(zlib.decompress(payload).decode('utf-8'))
+        connection.execute(refinements.insert(), [
+            {
+                'id': entry['id'],
+                'section_id': section_id,
+                'refinement_prompt': entry['refinement_prompt'],
+                'refined_content': entry['refined_content'],
+                'refined_content_z': zlib.compress(entry['refined_content'].encode('utf-8')),
+                'created_at': entry['created_at'] and datetime.fromisoformat(entry['created_at'])
+            }
+            for entry in entries
+        ])
+
+    with op.batch_alter_table('refinements', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_refinements_created_at'))
+        batch_op.alter_column('refined_content', existing_type=sa.Text(), nullable=False)
+        batch_op.drop_column('refined_content_z')
+
+    op.drop_index(op.f('ix_refinement_archives_id'), table_name='refinement_archives')
+    op.drop_index('ix_refinement_archives_section_last', table_name='refinement_archives')
+    op.drop_table('refinement_archives')
@@ -0,0 +1,172 @@
+"""content blobs
+
+Section and refinement text moves into content_blobs, keyed by SHA-256,
+and sections / refinements reference it by content_hash.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 06:03:51.227914
+
+"""
+import hashlib
+import zlib
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+content_blobs = sa.table(
+    'content_blobs',
+    sa.column('hash', sa.String()),
+    sa.column('content_z', sa.LargeBinary()),
+    sa.column('is_blank', sa.Boolean()),
+    sa.column('created_at', sa.DateTime()),
+    sa.column('last_used_at', sa.DateTime()),
+)
+sections = sa.table(
+    'sections',
+    sa.column('id', sa.Integer()),
+    sa.column('content', sa.Text()),
+    sa.column('content_hash', sa.String()),
+)
+refinements = sa.table(
+    'refinements',
+    sa.column('id', sa.Integer()),
+    sa.column('refined_content_z', sa.LargeBinary()),
+    sa.column('content_hash', sa.String()),
+)
+
+
+def _batches(table, source):
+    """(id, value) rows of ``table`` with a non-null ``source``, a batch at a time"""
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(table.c.id, source)
+            .where(table.c.id > last_id, source.isnot(None))
+            .order_by(table.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def _set(table, column, values) -> None:
+    op.get_bind().execute(
+        table.update().where(table.c.id == sa.bindparam('row_id')).values({column: sa.bindparam('value')}),
+        [{'row_id': row_id, 'value': value} for row_id, value in values]
+    )
+
+
+def _store(texts) -> list:
+    """Insert blobs for ``texts`` (skipping ones that exist) and return their hashes"""
+    connection = op.get_bind()
+    now = datetime.utcnow()
+    blobs = {}
+    hashes = []
+    for text in texts:
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        blobs[digest] = {
+            'hash': digest,
+            'content_z': zlib.compress(text.encode('utf-8')),
+            'is_blank': not text.strip(),
+            'created_at': now,
+            'last_used_at': now,
+        }
+        hashes.append(digest)
+    dialect = postgresql if connection.dialect.name == 'postgresql' else sqlite
+    connection.execute(
+        dialect.insert(content_blobs).on_conflict_do_nothing(index_elements=['hash']),
+        list(blobs.values())
+    )
+    return hashes
+
+
+def upgrade() -> None:
+    op.create_table('content_blobs',
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('content_z', sa.LargeBinary(), nullable=False),
+    sa.Column('is_blank', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_used_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    op.create_index(op.f('ix_content_blobs_last_used_at'), 'content_blobs', ['last_used_at'], unique=False)
+
+    op.add_column('sections', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('refinements', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+    for rows in _batches(sections, sections.c.content):
+        hashes = _store(content for _, content in rows)
+        _set(sections, 'content_hash', zip((row_id for row_id, _ in rows), hashes))
+    for rows in _batches(refinements, refinements.c.refined_content_z):
+        hashes = _store(zlib.decompress(data).decode('utf-8') for _, data in rows)
+        _set(refinements, 'content_hash', zip((row_id for row_id, _ in rows), hashes))
+
+    with op.batch_alter_table('sections', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_sections_content_hash'), ['content_hash'], unique=False)
+        batch_op.create_foreign_key('fk_sections_content_hash', 'content_blobs', ['content_hash'], ['hash'])
+        batch_op.drop_column('content')
+
+    with op.batch_alter_table('refinements', schema=None) as batch_op:
+        batch_op.alter_column('content_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.create_index(batch_op.f('ix_refinements_content_hash'), ['content_hash'], unique=False)
+        batch_op.create_foreign_key('fk_refinements_content_hash', 'content_blobs', ['content_hash'], ['hash'])
+        batch_op.drop_column('refined_content_z')
+
+
+def _blob_texts(table, decode):
+    """(id, decoded blob) for every row of ``table`` that references a blob"""
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(table.c.id, content_blobs.c.content_z)
+            .join(content_blobs, content_blobs.c.hash == table.c.content_hash)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        yield [(row_id, decode(data)) for row_id, data in rows]
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    op.add_column('sections', sa.Column('content', sa.Text(), nullable=True))
+    op.add_column('refinements', sa.Column('refined_content_z', sa.LargeBinary(), nullable=True))
+
+    for rows in _blob_texts(sections, lambda data: zlib.decompress(data).decode('utf-8')):
+        _set(sections, 'content', rows)
+    # Refinement bodies were compressed on their own before; the blob bytes are exactly that
+    for rows in _blob_texts(refinements, lambda data: data):
+        _set(refinements, 'refined_content_z', rows)
+
+    with op.batch_alter_table('refinements', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_refinements_content_hash', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_refinements_content_hash'))
+        batch_op.alter_column('refined_content_z', existing_type=sa.LargeBinary(), nullable=False)
+        batch_op.drop_column('content_hash')
+
+    with op.batch_alter_table('sections', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_sections_content_hash', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_sections_content_hash'))
+        batch_op.drop_column('content_hash')
+
+    op.drop_index(op.f('ix_content_blobs_last_used_at'), table_name='content_blobs')
+    op.drop_table('content_blobs')
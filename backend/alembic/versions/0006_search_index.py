@@ -0,0 +1,95 @@
+"""search index
+
+Full-text index over project names / main topics and section titles /
+content: an FTS5 table on SQLite, a tsvector column with a GIN index on
+PostgreSQL. Neither is in the ORM metadata (see env.py); the services keep
+it up to date (app/services/search_service.py).
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 06:48:30.561207
+
+"""
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+
+def _postgres() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    if _postgres():
+        op.execute(
+            "CREATE TABLE search_documents ("
+            " key BIGINT PRIMARY KEY,"
+            " project_id INTEGER NOT NULL,"
+            " section_id INTEGER,"
+            " title TEXT NOT NULL,"
+            " body TEXT NOT NULL,"
+            " document TSVECTOR GENERATED ALWAYS AS ("
+            "  setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', body), 'B')"
+            " ) STORED)"
+        )
+        op.execute("CREATE INDEX ix_search_documents_document ON search_documents USING GIN (document)")
+        insert = sa.text(
+            "INSERT INTO search_documents (key, project_id, section_id, title, body) "
+            "VALUES (:key, :project_id, :section_id, :title, :body)"
+        )
+    else:
+        op.execute(
+            "CREATE VIRTUAL TABLE search_index USING fts5("
+            "title, body, project_id UNINDEXED, section_id UNINDEXED, tokenize = 'porter unicode61')"
+        )
+        insert = sa.text(
+            "INSERT INTO search_index (rowid, project_id, section_id, title, body) "
+            "VALUES (:key, :project_id, :section_id, :title, :body)"
+        )
+
+    connection = op.get_bind()
+    projects = connection.execute(sa.text("SELECT id, name, main_topic FROM projects")).all()
+    for start in range(0, len(projects), BATCH_SIZE):
+        connection.execute(insert, [
+            {'key': -project_id, 'project_id': project_id, 'section_id': None, 'title': name, 'body': main_topic}
+            for project_id, name, main_topic in projects[start:start + BATCH_SIZE]
+        ])
+
+    last_id = 0
+    while True:
+        rows = connection.execute(sa.text(
+            "SELECT sections.id, sections.project_id, sections.title, content_blobs.content_z FROM sections "
+            "LEFT JOIN content_blobs ON content_blobs.hash = sections.content_hash "
+            "WHERE sections.id > :last_id ORDER BY sections.id LIMIT :limit"
+        ), {'last_id': last_id, 'limit': BATCH_SIZE}).all()
+        if not rows:
+            break
+        connection.execute(insert, [
+            {
+                'key': section_id,
+                'project_id': project_id,
+                'section_id': section_id,
+                'title': title,
+                'body': zlib.decompress(content_z).decode('utf-8') if content_z is not None else ''
+            }
+            for section_id, project_id, title, content_z in rows
+        ])
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    if _postgres():
+        op.execute("DROP TABLE search_documents")
+    else:
+        op.execute("DROP TABLE search_index")
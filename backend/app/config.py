@@ -6,18 +6,97 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    # Connection pool (per engine; the app runs one sync and one async engine)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Postgres only; SQLite connections don't go stale
+    # SQLite tuning applied to every connection (WAL, synchronous=NORMAL, mmap, ...)
+    SQLITE_TUNED: bool = True
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE_MB: int = 256
+    SQLITE_CACHE_SIZE_MB: int = 64
+    # Startup only checks that migrations are applied; set to True to apply them instead
+    DB_MIGRATE_ON_STARTUP: bool = False
     
     # JWT Authentication
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_USER_CACHE_TTL_SECONDS: float = 60.0
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 5000
+    
+    # Serialized GET /projects and /projects/{id} responses, validated by ETag
+    PROJECT_RESPONSE_CACHE_MAX_ENTRIES: int = 512
+    PROJECT_RESPONSE_CACHE_MAX_MB: int = 32
+    
+    # Password hashing (bcrypt runs in a separate process pool)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    
+    # AI backend: "gemini" or "fake" (deterministic, offline; for load testing)
+    AI_BACKEND: str = "gemini"
     
     # Gemini AI
-    GEMINI_API_KEY: str
+    GEMINI_API_KEY: str = ""
+    GEMINI_MODEL: str = "gemini-2.5-flash"
+    AI_GENERATION_CONCURRENCY: int = 4
+    
+    # AI response cache
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_TTL_SECONDS: int = 86400
+    AI_CACHE_MEMORY_MAX_ENTRIES: int = 512
+    AI_CACHE_DB_MAX_ENTRIES: int = 10000
+    
+    # Gemini quota, retries and circuit breaker
+    AI_RATE_LIMIT_RPM: int = 60
+    AI_RATE_LIMIT_TPM: int = 250000
+    AI_RATE_LIMIT_MAX_WAIT_SECONDS: float = 10.0
+    AI_ESTIMATED_OUTPUT_TOKENS: int = 800
+    AI_RETRY_MAX_ATTEMPTS: int = 3
+    AI_RETRY_BASE_DELAY_SECONDS: float = 0.5
+    AI_RETRY_MAX_DELAY_SECONDS: float = 8.0
+    AI_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    AI_CIRCUIT_RESET_SECONDS: float = 30.0
+    
+    # Background generation jobs
+    JOB_WORKER_COUNT: int = 2
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0
+    JOB_RETRY_DELAY_SECONDS: float = 5.0
+    JOB_HEARTBEAT_SECONDS: float = 15.0
+    JOB_STALE_AFTER_SECONDS: float = 90.0
+    
+    # Refinements older than this move to the compressed archive table (0 disables)
+    REFINEMENT_ARCHIVE_AFTER_DAYS: int = 30
+    REFINEMENT_ARCHIVE_INTERVAL_SECONDS: float = 3600.0
+    REFINEMENT_ARCHIVE_BATCH_SIZE: int = 200
+    # Unreferenced section/refinement text is deleted after this long (checked on the same interval)
+    CONTENT_BLOB_GC_AFTER_HOURS: float = 24.0
+    
+    # Near-duplicate prompt cache (memory per entry ~ 4 bytes x dimensions x fields)
+    AI_SIMILARITY_CACHE_ENABLED: bool = False
+    AI_SIMILARITY_THRESHOLD: float = 0.9
+    AI_SIMILARITY_MAX_ENTRIES: int = 2000
+    AI_SIMILARITY_DIMENSIONS: int = 1024
+    
+    # AI usage accounting (prices in USD per million tokens)
+    AI_USAGE_TRACKING_ENABLED: bool = True
+    AI_USAGE_FLUSH_SECONDS: float = 5.0
+    AI_INPUT_TOKEN_PRICE_PER_MILLION: float = 0.30
+    AI_OUTPUT_TOKEN_PRICE_PER_MILLION: float = 2.50
+    
+    # Fake AI backend
+    AI_FAKE_LATENCY_MS: int = 800
+    AI_FAKE_LATENCY_JITTER_MS: int = 200
+    AI_FAKE_ERROR_RATE: float = 0.0
+    AI_FAKE_SEED: int = 0
     
     # Application
     APP_NAME: str = "AI Document Platform"
     DEBUG: bool = False
+    WARM_UP_ON_STARTUP: bool = True
     
     class Config:
         env_file = ".env"
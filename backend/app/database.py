@@ -1,33 +1,134 @@
-from sqlalchemy import create_engine
+from pathlib import Path
+from typing import Optional, Tuple
+
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
 from app.config import get_settings
 
 settings = get_settings()
 
-# Check if using SQLite or PostgreSQL
-if settings.DATABASE_URL.startswith("sqlite"):
-    # SQLite configuration
-    engine = create_engine(
-        settings.DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        pool_pre_ping=True,
-        echo=settings.DEBUG
-    )
-else:
-    # PostgreSQL configuration
-    engine = create_engine(
-        settings.DATABASE_URL,
-        pool_pre_ping=True,
-        echo=settings.DEBUG
-    )
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+INITIAL_REVISION = "0001"
+
+def _is_sqlite(database_url) -> bool:
+    return make_url(database_url).get_backend_name() == "sqlite"
+
+def _is_sqlite_memory(database_url) -> bool:
+    return _is_sqlite(database_url) and make_url(database_url).database in (None, "", ":memory:")
+
+def sqlite_pragmas(tuned: bool = True) -> list:
+    """PRAGMAs run on every new SQLite connection"""
+    # Always on: bulk deletes rely on ON DELETE CASCADE, which SQLite ignores by default
+    pragmas = ["PRAGMA foreign_keys=ON"]
+    if not tuned:
+        return pragmas
+    return pragmas + [
+        # Readers no longer block the writer (and vice versa); persisted in the file
+        "PRAGMA journal_mode=WAL",
+        # Durable at checkpoints rather than every commit; safe with WAL
+        "PRAGMA synchronous=NORMAL",
+        # Wait for a competing writer instead of failing with "database is locked"
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024}",
+        # Negative values are KiB rather than pages
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_MB * 1024}",
+    ]
+
+def configure_sqlite(engine, tuned: bool = True):
+    """Apply sqlite_pragmas() to every connection the engine opens (sync or async engine)"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    pragmas = sqlite_pragmas(tuned)
+    
+    @event.listens_for(sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+    
+    return engine
+
+def engine_options(database_url, is_async: bool = False) -> dict:
+    """create_engine keyword arguments for a database URL"""
+    if not _is_sqlite(database_url):
+        return {
+            "pool_pre_ping": True,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+            "echo": settings.DEBUG
+        }
+    
+    options = {"connect_args": {"check_same_thread": False}, "echo": settings.DEBUG}
+    if _is_sqlite_memory(database_url):
+        # Every connection to :memory: is a separate database; share a single one
+        options["poolclass"] = StaticPool
+    else:
+        # Keep connections (and their page cache / mmap) open between requests; the
+        # defaults are NullPool for aiosqlite and a per-thread pool for some setups.
+        # No pre-ping: a local file connection doesn't go stale.
+        options["poolclass"] = AsyncAdaptedQueuePool if is_async else QueuePool
+        options["pool_size"] = settings.DB_POOL_SIZE
+        options["max_overflow"] = settings.DB_MAX_OVERFLOW
+    return options
+
+def create_db_engine(database_url: str, tuned: bool = settings.SQLITE_TUNED):
+    """Sync engine for a database URL, with SQLite tuning unless ``tuned`` is False"""
+    engine = create_engine(database_url, **engine_options(database_url))
+    if _is_sqlite(database_url):
+        configure_sqlite(engine, tuned)
+    return engine
+
+engine = create_db_engine(settings.DATABASE_URL)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def _async_database_url(database_url: str):
+    """Same database as DATABASE_URL, through its asyncio driver (aiosqlite / asyncpg)"""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+        # asyncpg spells libpq's sslmode as ssl
+        if "sslmode" in url.query:
+            url = url.update_query_dict({"ssl": url.query["sslmode"]}).difference_update_query(["sslmode"])
+        return url
+    return url
+
+# Async engine for request handlers and background jobs; the sync engine above
+# stays for scripts (test_setup.py), init_db and code that runs in a thread pool
+async_engine = create_async_engine(
+    _async_database_url(settings.DATABASE_URL),
+    **engine_options(settings.DATABASE_URL, is_async=True)
+)
+if _is_sqlite(settings.DATABASE_URL):
+    configure_sqlite(async_engine, settings.SQLITE_TUNED)
+
+# expire_on_commit=False: attributes of committed objects stay readable
+# without the implicit refresh that async sessions can't do
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base class for models
 Base = declarative_base()
 
+def dialect_insert(bind):
+    """INSERT construct with ON CONFLICT support for the bind's database (PostgreSQL or SQLite)"""
+    return postgresql.insert if bind.dialect.name == "postgresql" else sqlite.insert
+
 def get_db():
     """
     Dependency function to get database session.
@@ -39,6 +140,65 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """
+    Async counterpart of get_db.
+    Use in FastAPI endpoints like: db: AsyncSession = Depends(get_async_db)
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def release_connection(db):
+    """
+    Return the session's pooled connection while an async handler awaits slow
+    non-DB work (e.g. an AI call). Loaded objects are detached rather than
+    expired, so their attributes stay readable without another query.
+    """
+    db.expunge_all()
+    db.rollback()
+
+async def release_async_connection(db: AsyncSession):
+    """Async counterpart of release_connection"""
+    db.expunge_all()
+    await db.rollback()
+
+def _alembic_config():
+    from alembic.config import Config
+    
+    config = Config(str(ALEMBIC_INI))
+    # Leave the app's logging alone when migrations run in-process
+    config.attributes["configure_logging"] = False
+    return config
+
+def schema_revisions() -> Tuple[Optional[str], Tuple[str, ...]]:
+    """(revision the database is at, head revision(s) of the migration scripts)"""
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+    
+    heads = ScriptDirectory.from_config(_alembic_config()).get_heads()
+    with engine.connect() as connection:
+        current = MigrationContext.configure(connection).get_current_revision()
+    return current, tuple(heads)
+
+def check_migrations():
+    """Fail fast unless the database schema is at the latest migration.
+    
+    Cheap enough for every worker boot: one SELECT from alembic_version.
+    """
+    current, heads = schema_revisions()
+    if current not in heads:
+        raise RuntimeError(
+            f"Database schema is at revision {current or '(none)'} but the app expects "
+            f"{', '.join(heads)}; run `python init_db.py` (or `alembic upgrade head`) first"
+        )
+
 def init_db():
-    """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
+    """Create or upgrade the database schema by running the Alembic migrations"""
+    from alembic import command
+    
+    config = _alembic_config()
+    tables = set(inspect(engine).get_table_names())
+    if "users" in tables and "alembic_version" not in tables:
+        # Created by create_all before migrations existed; that schema is the first revision
+        command.stamp(config, INITIAL_REVISION)
+    command.upgrade(config, "head")
@@ -1,10 +1,11 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db, release_async_connection
 from app.utils import decode_access_token
-from app.services import AuthService
+from app.services import AsyncAuthService
+from app.services.auth_cache import token_cache, user_cache
 from app.models import User # Ensure all required imports are here
 
 # OAuth2 scheme for token authentication
@@ -13,7 +14,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 # Dependency to get current user from token
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Get current authenticated user"""
     credentials_exception = HTTPException(
@@ -22,16 +23,31 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    payload = decode_access_token(token)
+    # Skip signature verification for tokens already verified and not yet expired
+    payload = token_cache.get(token)
     if payload is None:
-        raise credentials_exception
+        payload = decode_access_token(token)
+        if payload is None:
+            raise credentials_exception
+        token_cache.set(token, payload)
     
     email: str = payload.get("sub")
+    user_id: int = payload.get("uid")  # absent from tokens issued before it was added
     if email is None:
         raise credentials_exception
     
-    user = AuthService.get_user_by_email(db, email=email)
+    user = user_cache.get(user_id=user_id, email=email)
+    if user is not None:
+        return user
+    
+    if user_id is not None:
+        user = await AsyncAuthService.get_user_by_id(db, user_id)
+    else:
+        user = await AsyncAuthService.get_user_by_email(db, email=email)
     if user is None:
         raise credentials_exception
+    user_cache.set(user)
     
+    # Don't pin a pooled connection for the rest of a possibly long request
+    await release_async_connection(db)
     return user
\ No newline at end of file
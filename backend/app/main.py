@@ -1,11 +1,24 @@
-from fastapi import FastAPI
+from app.startup import ImportTimer, warm_up
+
+# Installed before anything else is imported so the startup report covers the whole app
+import_timer = ImportTimer().install()
+
+import asyncio
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.routes import router as auth_router
 from app.routes.projects import router as projects_router
 from app.routes.ai_routes import router as ai_router
 from app.routes.export import router as export_router
 from app.config import get_settings
-from app.database import init_db
+from app.database import async_engine, check_migrations, init_db
+from app.services.job_service import job_workers
+from app.services.password_hasher import PasswordHasherBusy, password_hasher
+from app.services.refinement_service import refinement_archiver
+from app.services.resilience import AIServiceUnavailable
+from app.services.usage_service import usage_recorder
+from starlette.concurrency import run_in_threadpool
 
 settings = get_settings()
 
@@ -26,17 +39,70 @@ app.add_middleware(
     allow_credentials=True, 
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database tables on startup"""
+    """Check (or apply) database migrations and start background workers"""
     try:
-        init_db()
-        print("✅ Database initialized successfully")
+        if settings.DB_MIGRATE_ON_STARTUP:
+            await run_in_threadpool(init_db)
+            print("✅ Database migrations applied")
+        else:
+            check_migrations()
+            print("✅ Database schema is up to date")
     except Exception as e:
         print(f"❌ Database initialization error: {e}")
         raise
+    
+    password_hasher.start()
+    usage_recorder.start()
+    await job_workers.start()
+    print(f"✅ Started {settings.JOB_WORKER_COUNT} generation job worker(s)")
+    refinement_archiver.start()
+    
+    import_timer.uninstall()
+    print(import_timer.report())
+    
+    if settings.WARM_UP_ON_STARTUP:
+        # Not awaited: the server starts accepting requests while this runs
+        asyncio.ensure_future(warm_up_in_background())
+
+async def warm_up_in_background():
+    """Load the AI client and document libraries off the event loop"""
+    try:
+        timings = await run_in_threadpool(warm_up)
+        print("🔥 Warm-up done: " + ", ".join(f"{step} {elapsed:.0f} ms" for step, elapsed in timings))
+    except Exception as e:
+        print(f"⚠️ Warm-up failed, loading on first use instead: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers, write out pending AI usage records, stop the hashing pool and close DB connections"""
+    await job_workers.stop()
+    await refinement_archiver.stop()
+    await usage_recorder.stop()
+    password_hasher.shutdown()
+    await async_engine.dispose()
+
+@app.exception_handler(AIServiceUnavailable)
+async def ai_service_unavailable_handler(request: Request, exc: AIServiceUnavailable):
+    """Turn AI quota exhaustion or an open circuit into a retryable 503"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    """Shed sign-in load instead of queueing it behind a saturated hashing pool"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
 
 app.include_router(auth_router)
 app.include_router(projects_router)
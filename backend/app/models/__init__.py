@@ -1,7 +1,48 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, CheckConstraint
-from sqlalchemy.orm import relationship
+import hashlib
+import json
+import zlib
+from sqlalchemy import (
+    Boolean, Column, Integer, String, Text, DateTime, ForeignKey, CheckConstraint, Index, LargeBinary,
+    UniqueConstraint, event
+)
+from sqlalchemy.orm import Session, relationship
 from datetime import datetime
-from app.database import Base
+from app.database import Base, dialect_insert
+
+def compress_text(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"))
+
+def decompress_text(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8")
+
+def content_hash(text: str) -> str:
+    """Key of a text in content_blobs (SHA-256, hex)"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def _blob_content_property(doc: str) -> property:
+    """Text stored in content_blobs, read and written through the owner's content_hash.
+    
+    Setting it only hashes the text; the blob row is upserted when the
+    owner is flushed (see _store_pending_blobs).
+    """
+    def get(self):
+        if self.content_hash is None:
+            return None
+        known = self.__dict__.get("_blob_text")
+        if known is not None and known[0] == self.content_hash:
+            return known[1]
+        return self.content_blob.text
+    
+    def set(self, value):
+        if value is None:
+            self.content_hash = None
+            self._blob_text = self._pending_blob = None
+            return
+        self.content_hash = content_hash(value)
+        self._blob_text = (self.content_hash, value)
+        self._pending_blob = ContentBlob.row(value)
+    
+    return property(get, set, doc=doc)
 
 class User(Base):
     __tablename__ = "users"
@@ -34,6 +75,7 @@ class Project(Base):
     __table_args__ = (
         CheckConstraint("document_type IN ('docx', 'pptx')", name="check_document_type"),
         CheckConstraint("status IN ('draft', 'generating', 'completed')", name="check_status"),
+        Index("ix_projects_user_updated", "user_id", "updated_at", "id"),
     )
     
     # Relationships
@@ -48,28 +90,132 @@ class Section(Base):
     project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
     title = Column(String, nullable=False)
     position = Column(Integer, nullable=False)
-    content = Column(Text)
+    content_hash = Column(String(64), ForeignKey("content_blobs.hash", name="fk_sections_content_hash"), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Also serves lookups by project_id alone
+        Index("ix_sections_project_position", "project_id", "position"),
+    )
+    
     # Relationships
     project = relationship("Project", back_populates="sections")
-    refinements = relationship("Refinement", back_populates="section", cascade="all, delete-orphan")
+    content_blob = relationship("ContentBlob", lazy="joined", viewonly=True)
+    # Write-only: a section's refinement history can be long; page through it
+    # with RefinementService.get_history instead of loading it all
+    refinements = relationship(
+        "Refinement",
+        back_populates="section",
+        cascade="all, delete-orphan",
+        lazy="write_only",
+        passive_deletes=True
+    )
     feedback = relationship("Feedback", back_populates="section", cascade="all, delete-orphan")
     comments = relationship("Comment", back_populates="section", cascade="all, delete-orphan")
+    
+    content = _blob_content_property("The section's text (None when empty)")
 
 
 class Refinement(Base):
     __tablename__ = "refinements"
     
     id = Column(Integer, primary_key=True, index=True)
-    section_id = Column(Integer, ForeignKey("sections.id", ondelete="CASCADE"), nullable=False)
+    section_id = Column(Integer, ForeignKey("sections.id", ondelete="CASCADE"), nullable=False, index=True)
     refinement_prompt = Column(Text, nullable=False)
-    refined_content = Column(Text, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    content_hash = Column(
+        String(64), ForeignKey("content_blobs.hash", name="fk_refinements_content_hash"), nullable=False, index=True
+    )
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     
     # Relationships
     section = relationship("Section", back_populates="refinements")
+    content_blob = relationship("ContentBlob", lazy="joined", viewonly=True)
+    
+    refined_content = _blob_content_property("The refined text this refinement produced")
+
+
+class ContentBlob(Base):
+    """Section and refinement text, stored once per distinct value and keyed by its hash.
+    
+    Rows are immutable apart from last_used_at, which every upsert bumps so
+    that BlobService.collect_garbage leaves blobs that are being reused alone.
+    """
+    __tablename__ = "content_blobs"
+    
+    hash = Column(String(64), primary_key=True)
+    content_z = Column(LargeBinary, nullable=False)  # zlib-compressed
+    is_blank = Column(Boolean, nullable=False)  # empty or whitespace only
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    @property
+    def text(self) -> str:
+        """Decompressed on each access, so rows that are never read stay compressed"""
+        return decompress_text(self.content_z)
+    
+    @staticmethod
+    def row(text: str) -> dict:
+        """Column values for a blob holding ``text``"""
+        now = datetime.utcnow()
+        return {
+            "hash": content_hash(text),
+            "content_z": compress_text(text),
+            "is_blank": not text.strip(),
+            "created_at": now,
+            "last_used_at": now
+        }
+    
+    @staticmethod
+    def upsert_statement(bind):
+        """Insert blobs (executemany with row() dicts); existing ones only get last_used_at bumped"""
+        statement = dialect_insert(bind)(ContentBlob)
+        return statement.on_conflict_do_update(
+            index_elements=["hash"],
+            set_={"last_used_at": statement.excluded.last_used_at}
+        )
+
+
+@event.listens_for(Session, "before_flush")
+def _store_pending_blobs(session, flush_context, instances):
+    """Upsert the blobs of content set since the last flush, ahead of the rows that reference them"""
+    rows = {}
+    for instance in list(session.new) + list(session.dirty):
+        pending = instance.__dict__.pop("_pending_blob", None)
+        if pending is not None:
+            rows[pending["hash"]] = pending
+    if rows:
+        session.connection().execute(ContentBlob.upsert_statement(session.get_bind()), list(rows.values()))
+
+
+class RefinementArchive(Base):
+    """A batch of a section's old refinements, moved out of the refinements table.
+    
+    The batch is stored as one zlib-compressed JSON list (oldest first), so
+    near-identical versions of the same section compress against each other.
+    """
+    __tablename__ = "refinement_archives"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    section_id = Column(Integer, ForeignKey("sections.id", ondelete="CASCADE"), nullable=False)
+    first_refinement_id = Column(Integer, nullable=False)
+    last_refinement_id = Column(Integer, nullable=False)
+    refinement_count = Column(Integer, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_refinement_archives_section_last", "section_id", "last_refinement_id"),
+    )
+    
+    @property
+    def entries(self) -> list:
+        """The archived refinements as dicts (id, refinement_prompt, refined_content, created_at)"""
+        return json.loads(decompress_text(self.payload))
+    
+    @entries.setter
+    def entries(self, value: list):
+        self.payload = compress_text(json.dumps(value, separators=(",", ":")))
 
 
 class Feedback(Base):
@@ -77,12 +223,14 @@ class Feedback(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     section_id = Column(Integer, ForeignKey("sections.id", ondelete="CASCADE"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     feedback_type = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     __table_args__ = (
         CheckConstraint("feedback_type IN ('like', 'dislike')", name="check_feedback_type"),
+        # One vote per user per section; its index also serves lookups by section_id
+        UniqueConstraint("section_id", "user_id", name="uq_feedback_section_user"),
     )
     
     # Relationships
@@ -90,11 +238,20 @@ class Feedback(Base):
     user = relationship("User", back_populates="feedback")
 
 
+class SectionFeedbackCount(Base):
+    """Like/dislike totals per section, kept in step with feedback by the service layer"""
+    __tablename__ = "section_feedback_counts"
+    
+    section_id = Column(Integer, ForeignKey("sections.id", ondelete="CASCADE"), primary_key=True)
+    like_count = Column(Integer, nullable=False, default=0)
+    dislike_count = Column(Integer, nullable=False, default=0)
+
+
 class Comment(Base):
     __tablename__ = "comments"
     
     id = Column(Integer, primary_key=True, index=True)
-    section_id = Column(Integer, ForeignKey("sections.id", ondelete="CASCADE"), nullable=False)
+    section_id = Column(Integer, ForeignKey("sections.id", ondelete="CASCADE"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     comment_text = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -105,5 +262,78 @@ class Comment(Base):
     user = relationship("User", back_populates="comments")
 
 
+class AICacheEntry(Base):
+    __tablename__ = "ai_cache_entries"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String, unique=True, nullable=False, index=True)
+    model = Column(String, nullable=False)
+    response_text = Column(Text, nullable=False)
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_accessed_at = Column(DateTime, default=datetime.utcnow, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class GenerationJob(Base):
+    __tablename__ = "generation_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=True)
+    job_type = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    status = Column(String, nullable=False, default="queued")
+    progress = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    result = Column(Text)
+    error = Column(Text)
+    run_after = Column(DateTime, default=datetime.utcnow)
+    heartbeat_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime)
+    
+    __table_args__ = (
+        CheckConstraint(
+            "job_type IN ('generate_section', 'refine_section', 'generate_all')",
+            name="check_job_type"
+        ),
+        CheckConstraint(
+            "status IN ('queued', 'running', 'succeeded', 'failed')",
+            name="check_job_status"
+        ),
+        Index("ix_generation_jobs_status_run_after", "status", "run_after"),
+    )
+
+
+class AIUsageRecord(Base):
+    __tablename__ = "ai_usage_records"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="SET NULL"), nullable=True, index=True)
+    operation = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    prompt_tokens = Column(Integer)
+    completion_tokens = Column(Integer)
+    latency_ms = Column(Integer, nullable=False)
+    outcome = Column(String, nullable=False)
+    error = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        CheckConstraint(
+            "outcome IN ('success', 'error')",
+            name="check_usage_outcome"
+        ),
+        Index("ix_ai_usage_records_user_created", "user_id", "created_at"),
+    )
+
+
 # Export all models
-__all__ = ["User", "Project", "Section", "Refinement", "Feedback", "Comment"]
\ No newline at end of file
+__all__ = [
+    "User", "Project", "Section", "Refinement", "ContentBlob", "RefinementArchive", "Feedback", "SectionFeedbackCount", "Comment",
+    "AICacheEntry", "GenerationJob", "AIUsageRecord"
+]
\ No newline at end of file
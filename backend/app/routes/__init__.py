@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
-from app.database import get_db
+from app.database import get_async_db
 from app.schemas import UserCreate, UserResponse, Token, UserLogin
-from app.services import AuthService
+from app.services import AsyncAuthService
+from app.services.password_hasher import password_hasher
 from app.utils import create_access_token, decode_access_token
 from app.config import get_settings
 from app.dependencies import get_current_user, oauth2_scheme
@@ -16,42 +17,50 @@ router = APIRouter()
 
 # Registration endpoint
 @router.post("/auth/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
     # Check if user already exists
-    db_user = AuthService.get_user_by_email(db, email=user.email)
+    db_user = await AsyncAuthService.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # Create new user
-    new_user = AuthService.create_user(db=db, user=user)
+    # Create new user; bcrypt runs in the hashing process pool
+    hashed_password = await password_hasher.hash(user.password)
+    new_user = await AsyncAuthService.create_user(db=db, user=user, hashed_password=hashed_password)
     return new_user
 
 # Login endpoint
 @router.post("/auth/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """Login user and return access token"""
-    user = AuthService.authenticate_user(db, form_data.username, form_data.password)
-    if not user:
+    user = await AsyncAuthService.get_user_by_email(db, form_data.username)
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await password_hasher.verify_and_rehash(form_data.password, user.password_hash)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Transparently upgrade hashes made with an older bcrypt cost
+    if new_hash:
+        await AsyncAuthService.update_password_hash(db, user, new_hash)
+    
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "uid": user.id}, expires_delta=access_token_expires
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
 
 # Get current user endpoint
 @router.get("/auth/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: User = Depends(get_current_user)):
     """Get current user info"""
     return current_user
\ No newline at end of file
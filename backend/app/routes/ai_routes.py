@@ -1,119 +1,420 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
-from sqlalchemy.orm import Session
+import json
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Body
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from pydantic import BaseModel
-from app.models import Section
-from app.database import get_db
+from app.config import get_settings
+from app.database import AsyncSessionLocal, get_async_db, release_async_connection
 from app.dependencies import get_current_user
-from app.models import User
-from app.services.ai_service import AIService
-from app.services.project_service import ProjectService
+from app.models import Section, User
+from app.schemas import GenerationJobResponse, SectionResponse
+from app.services.ai_service import AsyncAIService
+from app.services.generation_service import GenerationService
+from app.services.job_service import AsyncJobService, job_workers
+from app.services.project_service import AsyncProjectService
+from app.services.resilience import AIServiceUnavailable, upstream_guard
+from app.services.similarity_cache import similarity_cache
+from app.services.singleflight import single_flight
+from app.services.usage_service import UsageService, set_usage_scope
 
+settings = get_settings()
+logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/ai", tags=["AI Generation"])
-ai_service = AIService()
+ai_service = AsyncAIService()
+generation_service = GenerationService(ai_service)
 
 class OutlineRequest(BaseModel):
     topic: str
     document_type: str
     num_sections: int = 5
+    bypass_cache: bool = False
 
 class GenerateContentRequest(BaseModel):
     project_id: int
     section_id: int
+    bypass_cache: bool = False
 
 class RefineContentRequest(BaseModel):
     section_id: int
     refinement_instruction: str
 
+# Sent instead of saving when a stream ends without any text (e.g. a blocked
+# response), so the section keeps its current content
+EMPTY_STREAM_DETAIL = "The AI service returned no content"
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format a Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _error_payload(error: Exception) -> dict:
+    """Body of an SSE error event, with a retry hint when the AI service is unavailable"""
+    payload = {"detail": str(error)}
+    if isinstance(error, AIServiceUnavailable):
+        payload["retry_after"] = error.retry_after
+    return payload
+
+async def _enqueue(db: AsyncSession, user_id: int, job_type: str, payload: dict, project_id: int) -> JSONResponse:
+    """Queue a background job and answer 202 with where to poll for it"""
+    job = await AsyncJobService.enqueue(db, user_id, job_type, payload, project_id)
+    job_workers.notify()
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job.id, "status": job.status},
+        headers={"Location": f"/ai/jobs/{job.id}"}
+    )
+
+def _section_payload(section: Section) -> dict:
+    """JSON-ready SectionResponse for an SSE event"""
+    return SectionResponse.model_validate(section).model_dump(mode="json")
+
+async def _save_streamed_content(section: Section, content: str, refinement_instruction: str = None) -> Section:
+    """Persist the assembled text of a finished stream.
+
+    Runs on its own session because the request-scoped one is closed
+    before a streaming response body is sent.
+    """
+    async with AsyncSessionLocal() as db:
+        return await AsyncProjectService.save_section_content(
+            db,
+            section,
+            content,
+            refinement_prompt=refinement_instruction
+        )
+
+@router.get("/stats")
+async def get_ai_stats(current_user: User = Depends(get_current_user)):
+    """Report AI call coalescing, rate limiter and circuit breaker state"""
+    return {
+        "single_flight": single_flight.stats(),
+        "similarity_cache": similarity_cache.stats(),
+        **upstream_guard.stats()
+    }
+
+@router.get("/usage/daily")
+async def get_daily_usage(
+    days: int = Query(7, ge=1, le=90),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """AI calls, p50/p95 latency, tokens and estimated cost per operation per day"""
+    return {"days": days, "usage": await UsageService.daily_summary(db, current_user.id, days)}
+
+@router.get("/usage/projects")
+async def get_project_usage(
+    days: int = Query(30, ge=1, le=365),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """AI usage per project over the last ``days`` days, most expensive first"""
+    return {"days": days, "usage": await UsageService.project_summary(db, current_user.id, days)}
+
 @router.post("/generate-outline")
-def generate_outline(
+async def generate_outline(
     request: OutlineRequest,
     current_user: User = Depends(get_current_user)
 ):
     """Generate document outline using AI"""
+    set_usage_scope(current_user.id)
     try:
-        titles = ai_service.generate_document_outline(
+        titles = await ai_service.generate_document_outline(
             request.topic,
             request.document_type,
-            request.num_sections
+            request.num_sections,
+            use_cache=not request.bypass_cache
         )
         return {"titles": titles}
+    except AIServiceUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/generate-document")
+async def generate_document(
+    request: OutlineRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Generate an outline and all section content in one structured AI request"""
+    set_usage_scope(current_user.id)
+    try:
+        sections = await ai_service.generate_full_document(
+            request.topic,
+            request.document_type,
+            request.num_sections,
+            use_cache=not request.bypass_cache
+        )
+        return {
+            "sections": [
+                {"title": section["title"], "position": position, "content": section["content"]}
+                for position, section in enumerate(sections)
+            ]
+        }
+    except AIServiceUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/generate-section-content")
-def generate_section_content(
+async def generate_section_content(
     request: GenerateContentRequest,
-    db: Session = Depends(get_db),
+    background: bool = False,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Generate content for a specific section"""
     # Get project
-    project = ProjectService.get_project(db, request.project_id, current_user.id)
+    project = await AsyncProjectService.get_project(db, request.project_id, current_user.id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     # Get section
-    section = db.query(Section).filter(Section.id == request.section_id).first()
+    section = await AsyncProjectService.get_section(db, request.section_id)
     if not section or section.project_id != request.project_id:
         raise HTTPException(status_code=404, detail="Section not found")
     
+    if background:
+        return await _enqueue(
+            db,
+            current_user.id,
+            "generate_section",
+            {
+                "project_id": request.project_id,
+                "section_id": request.section_id,
+                "use_cache": not request.bypass_cache
+            },
+            request.project_id
+        )
+    
+    set_usage_scope(current_user.id, project.id)
+    await release_async_connection(db)
+    
     try:
         # Generate content
-        content = ai_service.generate_section_content(
+        content = await ai_service.generate_section_content(
             project.main_topic,
             section.title,
-            project.document_type
+            project.document_type,
+            use_cache=not request.bypass_cache
         )
         
         # Update section
-        ProjectService.update_section_content(db, section.id, content)
+        section = await AsyncProjectService.save_section_content(db, section, content)
         
-        return {"content": content}
+        return {"content": content, "section": SectionResponse.model_validate(section)}
+    except AIServiceUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/refine-content")
-def refine_content(
+async def refine_content(
     request: RefineContentRequest,
-    db: Session = Depends(get_db),
+    background: bool = False,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Refine existing section content"""
-    from app.models import Section
-    
     # Get section
-    section = db.query(Section).filter(Section.id == request.section_id).first()
+    section = await AsyncProjectService.get_section(db, request.section_id)
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
     
     # Verify user owns the project
-    project = ProjectService.get_project(db, section.project_id, current_user.id)
+    project = await AsyncProjectService.get_project(db, section.project_id, current_user.id)
     if not project:
         raise HTTPException(status_code=403, detail="Access denied")
     
     if not section.content:
         raise HTTPException(status_code=400, detail="Section has no content to refine")
     
+    if background:
+        return await _enqueue(
+            db,
+            current_user.id,
+            "refine_section",
+            {
+                "section_id": request.section_id,
+                "refinement_instruction": request.refinement_instruction
+            },
+            project.id
+        )
+    
+    set_usage_scope(current_user.id, project.id)
+    await release_async_connection(db)
+    
     try:
         # Refine content
-        refined_content = ai_service.refine_content(
+        refined_content = await ai_service.refine_content(
             section.content,
             request.refinement_instruction,
             project.document_type
         )
         
-        # Save refinement history
-        ProjectService.add_refinement(
+        # Save refinement history and the new content together
+        section = await AsyncProjectService.save_section_content(
             db,
-            section.id,
-            request.refinement_instruction,
-            refined_content
+            section,
+            refined_content,
+            refinement_prompt=request.refinement_instruction
         )
         
-        # Update section content
-        ProjectService.update_section_content(db, section.id, refined_content)
-        
-        return {"refined_content": refined_content}
+        return {"refined_content": refined_content, "section": SectionResponse.model_validate(section)}
+    except AIServiceUnavailable:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/projects/{project_id}/generate-all")
+async def generate_all_sections(
+    project_id: int,
+    bypass_cache: bool = False,
+    background: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Generate content for every empty section of a project concurrently"""
+    project = await AsyncProjectService.get_project(db, project_id, current_user.id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    if background:
+        return await _enqueue(
+            db,
+            current_user.id,
+            "generate_all",
+            {"project_id": project_id, "use_cache": not bypass_cache},
+            project_id
+        )
+    
+    set_usage_scope(current_user.id, project_id)
+    try:
+        return await generation_service.generate_all_sections(
+            db,
+            project,
+            use_cache=not bypass_cache
+        )
+    except AIServiceUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/jobs/{job_id}", response_model=GenerationJobResponse)
+async def get_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get status, progress and result of a background generation job"""
+    job = await AsyncJobService.get_job(db, job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/generate-section-content/stream")
+async def stream_section_content(
+    request: GenerateContentRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream generated section content as Server-Sent Events"""
+    project = await AsyncProjectService.get_project(db, request.project_id, current_user.id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    section = await AsyncProjectService.get_section(db, request.section_id)
+    if not section or section.project_id != request.project_id:
+        raise HTTPException(status_code=404, detail="Section not found")
+    
+    set_usage_scope(current_user.id, project.id)
+    chunks = ai_service.stream_section_content(
+        project.main_topic,
+        section.title,
+        project.document_type,
+        use_cache=not request.bypass_cache
+    )
+    
+    async def event_stream():
+        parts = []
+        try:
+            async for chunk in chunks:
+                parts.append(chunk)
+                yield _sse_event("chunk", {"text": chunk})
+        except Exception as e:
+            yield _sse_event("error", _error_payload(e))
+            return
+        
+        content = "".join(parts).strip()
+        if not content:
+            yield _sse_event("error", {"detail": EMPTY_STREAM_DETAIL})
+            return
+        try:
+            saved = await _save_streamed_content(section, content)
+        except Exception as e:
+            logger.exception("Failed to save streamed content for section %s", section.id)
+            yield _sse_event("error", _error_payload(e))
+            return
+        yield _sse_event("done", {"content": content, "section": _section_payload(saved)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/refine-content/stream")
+async def stream_refine_content(
+    request: RefineContentRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream refined section content as Server-Sent Events"""
+    section = await AsyncProjectService.get_section(db, request.section_id)
+    if not section:
+        raise HTTPException(status_code=404, detail="Section not found")
+    
+    project = await AsyncProjectService.get_project(db, section.project_id, current_user.id)
+    if not project:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    if not section.content:
+        raise HTTPException(status_code=400, detail="Section has no content to refine")
+    
+    set_usage_scope(current_user.id, project.id)
+    chunks = ai_service.stream_refined_content(
+        section.content,
+        request.refinement_instruction,
+        project.document_type
+    )
+    
+    async def event_stream():
+        parts = []
+        try:
+            async for chunk in chunks:
+                parts.append(chunk)
+                yield _sse_event("chunk", {"text": chunk})
+        except Exception as e:
+            yield _sse_event("error", _error_payload(e))
+            return
+        
+        refined_content = "".join(parts).strip()
+        if not refined_content:
+            yield _sse_event("error", {"detail": EMPTY_STREAM_DETAIL})
+            return
+        try:
+            saved = await _save_streamed_content(
+                section,
+                refined_content,
+                request.refinement_instruction
+            )
+        except Exception as e:
+            logger.exception("Failed to save refined content for section %s", section.id)
+            yield _sse_event("error", _error_payload(e))
+            return
+        yield _sse_event("done", {"refined_content": refined_content, "section": _section_payload(saved)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
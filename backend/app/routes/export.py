@@ -1,24 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
-from app.database import get_db
+from app.database import get_async_db
 from app.routes import get_current_user
 from app.models import User
-from app.services.project_service import ProjectService
+from app.services.project_service import AsyncProjectService
 from app.services.document_service import DocumentService
 
 router = APIRouter(prefix="/export", tags=["Export"])
 
 @router.get("/{project_id}")
-def export_document(
+async def export_document(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Export project as Word or PowerPoint document"""
     # Get project
-    project = ProjectService.get_project(db, project_id, current_user.id)
+    project = await AsyncProjectService.get_project(db, project_id, current_user.id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -29,12 +30,12 @@ def export_document(
         raise HTTPException(status_code=400, detail="Project has no sections to export")
     
     try:
-        # Generate document based on type
+        # Generate document based on type; building the file is CPU-bound, so keep it off the event loop
         if project.document_type == 'docx':
-            file_stream = DocumentService.generate_word_document(project, sections)
+            file_stream = await run_in_threadpool(DocumentService.generate_word_document, project, sections)
             media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
         else:  # pptx
-            file_stream = DocumentService.generate_powerpoint_presentation(project, sections)
+            file_stream = await run_in_threadpool(DocumentService.generate_powerpoint_presentation, project, sections)
             media_type = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
         
         # Get filename
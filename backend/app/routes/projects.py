@@ -1,54 +1,247 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
 
-from app.database import get_db
+from app.database import get_async_db
 from app.routes import get_current_user
 from app.models import User
-from app.schemas import ProjectCreate, ProjectResponse, SectionCreate, SectionResponse
-from app.services.project_service import ProjectService
-from app.services.ai_service import AIService
+from app.schemas import (
+    FeedbackCreate, ProjectCreate, ProjectResponse, ProjectSummaryResponse, RefinementResponse, SearchResult,
+    SectionBatchRequest, SectionCreate, SectionFeedbackResponse, SectionResponse
+)
+from app.services.project_service import AsyncProjectService, ProjectService
+from app.services.refinement_service import RefinementService
+from app.services.response_cache import etag_matches, make_etag, project_response_cache
+from app.services.search_service import SearchService
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
-ai_service = AIService()
+
+_project_list = TypeAdapter(List[ProjectResponse])
+_project_summary_list = TypeAdapter(List[ProjectSummaryResponse])
+
+def _cached_json(body: bytes, etag: str, headers: Optional[dict] = None) -> Response:
+    # no-cache: browsers keep the body but revalidate (If-None-Match) on every use
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "private, no-cache", **(headers or {})}
+    )
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
 
 @router.post("", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
-def create_project(
+async def create_project(
     project: ProjectCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new project"""
-    return ProjectService.create_project(db, current_user.id, project)
+    return await AsyncProjectService.create_project(db, current_user.id, project)
+
+@router.get(
+    "",
+    response_model=None,
+    responses={200: {"model": Union[List[ProjectResponse], List[ProjectSummaryResponse]]}, 304: {}}
+)
+async def get_projects(
+    summary: bool = False,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get projects for current user, newest first.
+    
+    With ``summary=true`` sections are left out and only their counts are
+    returned. With ``limit`` the next page's cursor is sent in the
+    X-Next-Cursor header. Responses carry a strong ETag; a matching
+    If-None-Match gets 304 Not Modified without the projects being loaded.
+    """
+    after = None
+    if cursor:
+        try:
+            after = ProjectService.decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    version = await AsyncProjectService.get_user_projects_version(db, current_user.id)
+    etag = make_etag("projects", current_user.id, summary, limit, cursor, *version)
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    
+    key = ("projects", current_user.id, summary, limit, cursor)
+    cached = project_response_cache.get(key, etag)
+    if cached is not None:
+        return _cached_json(cached[0], etag, cached[1])
+    
+    if summary:
+        rows, next_cursor = await AsyncProjectService.get_user_project_summaries(db, current_user.id, limit, after)
+        body = _project_summary_list.dump_json([ProjectSummaryResponse.model_validate(row) for row in rows])
+    else:
+        rows, next_cursor = await AsyncProjectService.get_user_projects(db, current_user.id, limit, after)
+        body = _project_list.dump_json([ProjectResponse.model_validate(project) for project in rows])
+    
+    headers = {}
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = ProjectService.encode_cursor(*next_cursor)
+    project_response_cache.set(key, etag, body, headers)
+    return _cached_json(body, etag, headers)
+
+@router.get("/search", response_model=List[SearchResult])
+async def search_projects(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Full-text search over the current user's project names, topics, section titles and content.
+    
+    Results are ranked best first, with highlighted snippets; the next
+    page's cursor is sent in the X-Next-Cursor header.
+    """
+    offset = 0
+    if cursor:
+        try:
+            offset = SearchService.decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    results, more = await SearchService.search(db, current_user.id, q, limit, offset)
+    if more:
+        response.headers["X-Next-Cursor"] = SearchService.encode_cursor(offset + limit)
+    return results
 
-@router.get("", response_model=List[ProjectResponse])
-def get_projects(
-    db: Session = Depends(get_db),
+@router.get("/{project_id}", response_model=ProjectResponse, responses={304: {}})
+async def get_project(
+    project_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all projects for current user"""
-    return ProjectService.get_user_projects(db, current_user.id)
+    """Get a specific project.
+    
+    Responses carry a strong ETag; a matching If-None-Match gets 304 Not
+    Modified without the project being loaded.
+    """
+    version = await AsyncProjectService.get_project_version(db, project_id, current_user.id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    etag = make_etag("project", project_id, *version)
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    
+    key = ("project", project_id)
+    cached = project_response_cache.get(key, etag)
+    if cached is not None:
+        return _cached_json(cached[0], etag)
+    
+    project = await AsyncProjectService.get_project(db, project_id, current_user.id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    body = ProjectResponse.model_validate(project).model_dump_json().encode()
+    project_response_cache.set(key, etag, body)
+    return _cached_json(body, etag)
+
+@router.patch("/{project_id}/sections", response_model=List[SectionResponse])
+async def update_sections(
+    project_id: int,
+    batch: SectionBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Apply a batch of add / move / retitle / delete section operations atomically.
+    
+    Returns the project's sections in their new order.
+    """
+    project = await AsyncProjectService.get_project(db, project_id, current_user.id, with_sections=False)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    try:
+        return await AsyncProjectService.apply_section_operations(db, project_id, batch.operations)
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{project_id}/sections/{section_id}/refinements", response_model=List[RefinementResponse])
+async def get_refinement_history(
+    project_id: int,
+    section_id: int,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """A section's refinement history, newest first, including archived refinements.
+    
+    The next page's cursor is sent in the X-Next-Cursor header.
+    """
+    before = None
+    if cursor:
+        try:
+            before = RefinementService.decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    project = await AsyncProjectService.get_project(db, project_id, current_user.id, with_sections=False)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    section = await AsyncProjectService.get_section(db, section_id)
+    if not section or section.project_id != project_id:
+        raise HTTPException(status_code=404, detail="Section not found")
+    
+    entries, next_before = await RefinementService.get_history(db, section_id, limit, before)
+    if next_before is not None:
+        response.headers["X-Next-Cursor"] = RefinementService.encode_cursor(next_before)
+    return entries
+
+@router.post("/{project_id}/sections/{section_id}/feedback", response_model=SectionFeedbackResponse)
+async def add_section_feedback(
+    project_id: int,
+    section_id: int,
+    feedback: FeedbackCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Like or dislike a section; voting again replaces the user's previous vote"""
+    project = await AsyncProjectService.get_project(db, project_id, current_user.id, with_sections=False)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    section = await AsyncProjectService.get_section(db, section_id)
+    if not section or section.project_id != project_id:
+        raise HTTPException(status_code=404, detail="Section not found")
+    
+    return await AsyncProjectService.add_feedback(db, section_id, current_user.id, feedback.feedback_type)
 
-@router.get("/{project_id}", response_model=ProjectResponse)
-def get_project(
+@router.get("/{project_id}/feedback", response_model=List[SectionFeedbackResponse])
+async def get_project_feedback(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get a specific project"""
-    project = ProjectService.get_project(db, project_id, current_user.id)
+    """Like/dislike totals for each section of a project, in section order"""
+    project = await AsyncProjectService.get_project(db, project_id, current_user.id, with_sections=False)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    return project
+    return await AsyncProjectService.get_feedback_counts(db, project_id, current_user.id)
 
 @router.delete("/{project_id}")
-def delete_project(
+async def delete_project(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a project"""
-    success = ProjectService.delete_project(db, project_id, current_user.id)
+    success = await AsyncProjectService.delete_project(db, project_id, current_user.id)
     if not success:
         raise HTTPException(status_code=404, detail="Project not found")
     return {"message": "Project deleted successfully"}
\ No newline at end of file
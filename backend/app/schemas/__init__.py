@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr
+import json
+from pydantic import BaseModel, EmailStr, Field, field_validator
 from datetime import datetime
-from typing import Optional, List
+from typing import Annotated, Any, Literal, Optional, List, Union
 
 # User Schemas
 class UserBase(BaseModel):
@@ -40,12 +41,61 @@ class SectionCreate(SectionBase):
 class SectionResponse(SectionBase):
     id: int
     project_id: int
+    content_hash: Optional[str] = None  # SHA-256 of content; equal hashes mean equal content
     created_at: datetime
     updated_at: datetime
     
     class Config:
         from_attributes = True
 
+# Section batch operations; positions are 0-based indexes into the section
+# list as it stands after the preceding operations
+class AddSectionOperation(BaseModel):
+    op: Literal["add"]
+    title: str = Field(min_length=1)
+    content: Optional[str] = None
+    position: Optional[int] = Field(None, ge=0)  # default: append
+
+class MoveSectionOperation(BaseModel):
+    op: Literal["move"]
+    section_id: int
+    position: int = Field(ge=0)
+
+class RetitleSectionOperation(BaseModel):
+    op: Literal["retitle"]
+    section_id: int
+    title: str = Field(min_length=1)
+
+class DeleteSectionOperation(BaseModel):
+    op: Literal["delete"]
+    section_id: int
+
+SectionOperation = Annotated[
+    Union[AddSectionOperation, MoveSectionOperation, RetitleSectionOperation, DeleteSectionOperation],
+    Field(discriminator="op")
+]
+
+class SectionBatchRequest(BaseModel):
+    operations: List[SectionOperation] = Field(min_length=1, max_length=500)
+
+class RefinementResponse(BaseModel):
+    id: int
+    section_id: int
+    refinement_prompt: str
+    refined_content: str
+    created_at: Optional[datetime] = None
+    archived: bool = False
+
+# Feedback Schemas
+class FeedbackCreate(BaseModel):
+    feedback_type: Literal["like", "dislike"]
+
+class SectionFeedbackResponse(BaseModel):
+    section_id: int
+    like_count: int
+    dislike_count: int
+    user_feedback: Optional[str] = None  # the current user's vote, if any
+
 class ProjectBase(BaseModel):
     name: str
     document_type: str
@@ -63,4 +113,47 @@ class ProjectResponse(ProjectBase):
     sections: List[SectionResponse] = []
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class ProjectSummaryResponse(ProjectBase):
+    id: int
+    user_id: int
+    status: str
+    created_at: datetime
+    updated_at: datetime
+    section_count: int
+    generated_section_count: int
+
+
+class SearchResult(BaseModel):
+    project_id: int
+    section_id: Optional[int] = None  # None: the match is the project's name / main topic
+    project_name: str
+    title: str
+    snippet: str  # HTML-escaped, with matches wrapped in <mark></mark>
+    score: float
+
+
+# Job Schemas
+class GenerationJobResponse(BaseModel):
+    id: int
+    job_type: str
+    project_id: Optional[int] = None
+    status: str
+    progress: int
+    attempts: int
+    max_attempts: int
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+    @field_validator("result", mode="before")
+    @classmethod
+    def parse_result(cls, value):
+        return json.loads(value) if isinstance(value, str) else value
+
+    class Config:
+        from_attributes = True
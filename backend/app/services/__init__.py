@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models import User
 from app.schemas import UserCreate
@@ -8,9 +10,10 @@ class AuthService:
     """Service for authentication operations"""
     
     @staticmethod
-    def create_user(db: Session, user: UserCreate) -> User:
-        """Create a new user"""
-        hashed_password = get_password_hash(user.password)
+    def create_user(db: Session, user: UserCreate, hashed_password: Optional[str] = None) -> User:
+        """Create a new user; pass ``hashed_password`` if it was already computed off-thread"""
+        if hashed_password is None:
+            hashed_password = get_password_hash(user.password)
         db_user = User(
             email=user.email,
             password_hash=hashed_password,
@@ -21,11 +24,24 @@ class AuthService:
         db.refresh(db_user)
         return db_user
     
+    @staticmethod
+    def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
+        """Get user by id"""
+        return db.get(User, user_id)
+    
     @staticmethod
     def get_user_by_email(db: Session, email: str) -> Optional[User]:
         """Get user by email"""
         return db.query(User).filter(User.email == email).first()
     
+    @staticmethod
+    def update_password_hash(db: Session, user: User, hashed_password: str) -> User:
+        """Replace a user's stored password hash (e.g. after a bcrypt cost change)"""
+        user.password_hash = hashed_password
+        db.commit()
+        db.refresh(user)
+        return user
+    
     @staticmethod
     def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
         """Authenticate user with email and password"""
@@ -34,4 +50,38 @@ class AuthService:
             return None
         if not verify_password(password, user.password_hash):
             return None
-        return user
\ No newline at end of file
+        return user
+
+class AsyncAuthService:
+    """Async counterpart of AuthService; password hashing is left to the caller"""
+    
+    @staticmethod
+    async def create_user(db: AsyncSession, user: UserCreate, hashed_password: str) -> User:
+        """Create a new user from an already computed password hash"""
+        db_user = User(
+            email=user.email,
+            password_hash=hashed_password,
+            full_name=user.full_name
+        )
+        db.add(db_user)
+        await db.commit()
+        await db.refresh(db_user)
+        return db_user
+    
+    @staticmethod
+    async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
+        """Get user by id"""
+        return await db.get(User, user_id)
+    
+    @staticmethod
+    async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+        """Get user by email"""
+        return (await db.execute(select(User).where(User.email == email))).scalars().first()
+    
+    @staticmethod
+    async def update_password_hash(db: AsyncSession, user: User, hashed_password: str) -> User:
+        """Replace a user's stored password hash (e.g. after a bcrypt cost change)"""
+        user.password_hash = hashed_password
+        await db.commit()
+        await db.refresh(user)
+        return user
@@ -1,31 +1,24 @@
-import google.generativeai as genai
+import asyncio
+import json
+import time
+from starlette.concurrency import run_in_threadpool
 from app.config import get_settings
-from typing import List, Dict
+from app.services.cache_service import make_cache_key, normalize_prompt, prompt_cache
+from app.services.llm_backends import LLMBackend, get_llm_backend
+from app.services.resilience import AIServiceError, AIServiceUnavailable, estimate_tokens, upstream_guard
+from app.services.similarity_cache import similarity_cache
+from app.services.singleflight import single_flight
+from app.services.usage_service import usage_recorder
+from typing import AsyncIterator, Awaitable, Callable, Hashable, List, Dict, Optional, Tuple
 
 settings = get_settings()
 
-# Configure Gemini API
-genai.configure(api_key=settings.GEMINI_API_KEY)
-
-class AIService:
-    """Service for AI content generation using Gemini"""
-    
-    def __init__(self):
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
-    
-    def generate_content(self, prompt: str) -> str:
-        """Generate content using Gemini API"""
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            raise Exception(f"AI generation failed: {str(e)}")
-    
-    def generate_document_outline(self, topic: str, document_type: str, num_sections: int = 5) -> List[str]:
-        """Generate an outline for a document"""
-        if document_type == "docx":
-            prompt = f"""Generate {num_sections} section titles for a professional Word document about: {topic}
-            
+
+def build_outline_prompt(topic: str, document_type: str, num_sections: int = 5) -> str:
+    """Build the prompt used to generate a document outline"""
+    if document_type == "docx":
+        return f"""Generate {num_sections} section titles for a professional Word document about: {topic}
+
 Return only the section titles, one per line, without numbering or extra formatting.
 Example format:
 Introduction
@@ -33,9 +26,9 @@ Background and Context
 Main Analysis
 Key Findings
 Conclusion"""
-        else:  # pptx
-            prompt = f"""Generate {num_sections} slide titles for a professional PowerPoint presentation about: {topic}
-            
+    # pptx
+    return f"""Generate {num_sections} slide titles for a professional PowerPoint presentation about: {topic}
+
 Return only the slide titles, one per line, without numbering or extra formatting.
 Example format:
 Introduction to {topic}
@@ -43,25 +36,23 @@ Key Concepts
 Main Points
 Analysis and Insights
 Conclusion and Next Steps"""
-        
-        try:
-            response = self.model.generate_content(prompt)
-            # Split response into lines and clean up
-            titles = [line.strip() for line in response.text.split('\n') if line.strip()]
-            return titles[:num_sections]  # Return exactly num_sections titles
-        except Exception as e:
-            raise Exception(f"Outline generation failed: {str(e)}")
-    
-    def generate_section_content(
-        self, 
-        topic: str, 
-        section_title: str, 
-        document_type: str,
-        additional_context: str = ""
-    ) -> str:
-        """Generate content for a specific section/slide"""
-        if document_type == "docx":
-            prompt = f"""Write professional content for a Word document section.
+
+
+def parse_outline(text: str, num_sections: int) -> List[str]:
+    """Split an outline response into clean section titles"""
+    titles = [line.strip() for line in text.split('\n') if line.strip()]
+    return titles[:num_sections]  # Return exactly num_sections titles
+
+
+def build_section_prompt(
+    topic: str,
+    section_title: str,
+    document_type: str,
+    additional_context: str = ""
+) -> str:
+    """Build the prompt used to generate content for a section/slide"""
+    if document_type == "docx":
+        return f"""Write professional content for a Word document section.
 
 Document Topic: {topic}
 Section Title: {section_title}
@@ -69,8 +60,8 @@ Section Title: {section_title}
 
 Write 2-3 well-structured paragraphs (150-250 words) with clear, professional content.
 Do not include the section title in your response, only the content."""
-        else:  # pptx
-            prompt = f"""Write concise content for a PowerPoint slide.
+    # pptx
+    return f"""Write concise content for a PowerPoint slide.
 
 Presentation Topic: {topic}
 Slide Title: {section_title}
@@ -79,21 +70,67 @@ Slide Title: {section_title}
 Write 3-5 bullet points with clear, concise content suitable for a presentation slide.
 Format each point on a new line starting with a bullet point (•).
 Keep each point to 1-2 sentences maximum."""
-        
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
-        except Exception as e:
-            raise Exception(f"Content generation failed: {str(e)}")
-    
-    def refine_content(
-        self, 
-        original_content: str, 
-        refinement_instruction: str,
-        document_type: str
-    ) -> str:
-        """Refine existing content based on user instructions"""
-        prompt = f"""You are refining content for a {'Word document' if document_type == 'docx' else 'PowerPoint presentation'}.
+
+
+def build_document_prompt(topic: str, document_type: str, num_sections: int = 5) -> str:
+    """Build the prompt used to generate an outline and every section body in one call"""
+    if document_type == "docx":
+        unit = "section"
+        content_rules = """Each section's content must be 2-3 well-structured paragraphs (150-250 words) of clear, professional prose.
+Separate paragraphs with a blank line and do not repeat the section title in the content."""
+    else:  # pptx
+        unit = "slide"
+        content_rules = """Each slide's content must be 3-5 bullet points, each on its own line starting with a bullet point (•).
+Keep each point to 1-2 sentences maximum."""
+    return f"""Write a complete professional {'Word document' if document_type == 'docx' else 'PowerPoint presentation'} about: {topic}
+
+It must have exactly {num_sections} {unit}s.
+{content_rules}
+
+Respond with JSON only, using this structure:
+{{"sections": [{{"title": "<{unit} title>", "content": "<{unit} content>"}}]}}"""
+
+
+def parse_document(text: str, num_sections: int) -> List[Dict[str, str]]:
+    """Parse a structured document response into [{"title", "content"}] items.
+
+    Items with a missing or malformed title are dropped. A missing or
+    malformed content is returned as an empty string so the caller can
+    fill it in with a per-section call.
+    """
+    text = text.strip()
+    if text.startswith("```"):
+        # Tolerate a fenced code block around the JSON
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return []
+
+    items = data.get("sections") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return []
+
+    sections = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        title = item.get("title")
+        if not isinstance(title, str) or not title.strip():
+            continue
+        content = item.get("content")
+        if isinstance(content, list) and all(isinstance(point, str) for point in content):
+            content = "\n".join(point.strip() for point in content if point.strip())
+        if not isinstance(content, str):
+            content = ""
+        sections.append({"title": title.strip(), "content": content.strip()})
+    return sections[:num_sections]
+
+
+def build_refine_prompt(original_content: str, refinement_instruction: str, document_type: str) -> str:
+    """Build the prompt used to refine existing content"""
+    return f"""You are refining content for a {'Word document' if document_type == 'docx' else 'PowerPoint presentation'}.
 
 Original Content:
 {original_content}
@@ -103,9 +140,326 @@ User's Refinement Request:
 
 Please provide the refined version of the content following the user's instructions.
 Maintain professional tone and appropriate length for the document type."""
-        
+
+
+# (partition key, fields) describing a prompt to the similarity cache
+SimilarityKey = Tuple[Hashable, Tuple[str, ...]]
+
+
+def outline_similarity_key(topic: str, document_type: str, num_sections: int) -> SimilarityKey:
+    """Outlines are interchangeable for near-identical topics with the same type and length"""
+    return ("outline", document_type, num_sections), (topic,)
+
+
+def section_similarity_key(
+    topic: str,
+    section_title: str,
+    document_type: str,
+    additional_context: str = ""
+) -> SimilarityKey:
+    """Section content needs both the topic and the title to be near-identical"""
+    return ("section", document_type, normalize_prompt(additional_context)), (topic, section_title)
+
+
+class AsyncAIService:
+    """Service for AI content generation using the configured LLM backend.
+
+    Uses the backend's native async generation call so an in-flight
+    request does not hold a threadpool worker. Every upstream call goes
+    through the rate limiter and circuit breaker (upstream_guard) and
+    identical concurrent prompts share one call (single_flight).
+    """
+
+    def __init__(self, backend: LLMBackend = None):
+        self._backend = backend
+
+    @property
+    def backend(self) -> LLMBackend:
+        # Resolved on first call so importing the routes doesn't load the AI SDK
+        if self._backend is None:
+            self._backend = get_llm_backend()
+        return self._backend
+
+    async def _generate_text(
+        self,
+        operation: str,
+        prompt: str,
+        use_cache: bool = True,
+        generation_config: dict = None,
+        cacheable: Callable[[str], bool] = None,
+        similar: Optional[SimilarityKey] = None
+    ) -> str:
+        """Return the response text for a prompt, consulting the prompt cache.
+
+        With ``similar`` a near-duplicate earlier prompt's response is
+        reused too. With ``use_cache=False`` the lookups are skipped but the
+        fresh response is still cached. Memory-tier hits are served inline; the DB tier runs in the threadpool.
+        When ``cacheable`` is given, only responses it accepts are stored.
+        """
+        if use_cache and similar is not None:
+            cached = similarity_cache.get(*similar)
+            if cached is not None:
+                return cached
+
+        key = make_cache_key(self.backend.model_name, prompt)
+        if use_cache and settings.AI_CACHE_ENABLED:
+            cached = prompt_cache.get_memory(key)
+            if cached is None:
+                cached = await run_in_threadpool(prompt_cache.get, key)
+            if cached:
+                return cached
+
+        async def store(text: str):
+            # Runs once per upstream call, so coalesced callers don't index duplicates
+            if not text.strip():
+                return
+            if similar is not None:
+                similarity_cache.set(*similar, text)
+            if settings.AI_CACHE_ENABLED and (cacheable is None or cacheable(text)):
+                await run_in_threadpool(prompt_cache.set, key, self.backend.model_name, text)
+
+        return await self._call_model(operation, prompt, generation_config, on_result=store)
+
+    async def _call_model(
+        self,
+        operation: str,
+        prompt: str,
+        generation_config: dict = None,
+        on_result: Callable[[str], Awaitable[None]] = None
+    ) -> str:
+        """Call the backend, sharing one upstream request among identical concurrent prompts.
+
+        ``on_result`` runs once, inside the shared call, with the response text.
+        """
+        flight_key = make_cache_key(self.backend.model_name, prompt)
+        if generation_config:
+            flight_key += ":" + json.dumps(generation_config, sort_keys=True)
+
+        async def call() -> str:
+            response = await upstream_guard.call(
+                lambda: usage_recorder.track(
+                    operation,
+                    self.backend.model_name,
+                    lambda: self.backend.generate_async(prompt, generation_config)
+                ),
+                estimate_tokens(prompt)
+            )
+            text = response.text
+            if on_result is not None:
+                await on_result(text)
+            return text
+
+        return await single_flight.do(flight_key, call)
+
+    async def generate_content(self, prompt: str) -> str:
+        """Generate content using the LLM backend"""
+        try:
+            return await self._call_model("content", prompt)
+        except AIServiceUnavailable:
+            raise
+        except Exception as e:
+            raise AIServiceError(f"AI generation failed: {str(e)}")
+
+    async def generate_document_outline(
+        self,
+        topic: str,
+        document_type: str,
+        num_sections: int = 5,
+        use_cache: bool = True
+    ) -> List[str]:
+        """Generate an outline for a document"""
+        prompt = build_outline_prompt(topic, document_type, num_sections)
+
+        try:
+            text = await self._generate_text(
+                "outline",
+                prompt,
+                use_cache,
+                similar=outline_similarity_key(topic, document_type, num_sections)
+            )
+            return parse_outline(text, num_sections)
+        except AIServiceUnavailable:
+            raise
+        except Exception as e:
+            raise AIServiceError(f"Outline generation failed: {str(e)}")
+
+    async def generate_section_content(
+        self,
+        topic: str,
+        section_title: str,
+        document_type: str,
+        additional_context: str = "",
+        use_cache: bool = True
+    ) -> str:
+        """Generate content for a specific section/slide"""
+        prompt = build_section_prompt(topic, section_title, document_type, additional_context)
+
+        try:
+            text = await self._generate_text(
+                "section",
+                prompt,
+                use_cache,
+                similar=section_similarity_key(topic, section_title, document_type, additional_context)
+            )
+            return text.strip()
+        except AIServiceUnavailable:
+            raise
+        except Exception as e:
+            raise AIServiceError(f"Content generation failed: {str(e)}")
+
+    async def generate_full_document(
+        self,
+        topic: str,
+        document_type: str,
+        num_sections: int = 5,
+        use_cache: bool = True
+    ) -> List[Dict[str, str]]:
+        """Generate the outline and every section body with a single structured request.
+
+        Falls back to per-section calls only for sections whose content came
+        back missing or malformed, and to a separate outline call when no
+        usable titles came back at all.
+        """
+        prompt = build_document_prompt(topic, document_type, num_sections)
+
+        try:
+            text = await self._generate_text(
+                "document",
+                prompt,
+                use_cache,
+                generation_config={"response_mime_type": "application/json"},
+                cacheable=lambda text: bool(parse_document(text, num_sections))
+            )
+            sections = parse_document(text, num_sections)
+        except AIServiceUnavailable:
+            raise
+        except Exception:
+            sections = []
+
+        if not sections:
+            titles = await self.generate_document_outline(topic, document_type, num_sections, use_cache)
+            sections = [{"title": title, "content": ""} for title in titles]
+
+        missing = [section for section in sections if not section["content"]]
+        if missing:
+            semaphore = asyncio.Semaphore(max(1, settings.AI_GENERATION_CONCURRENCY))
+
+            async def fill(section: Dict[str, str]):
+                async with semaphore:
+                    section["content"] = await self.generate_section_content(
+                        topic,
+                        section["title"],
+                        document_type,
+                        use_cache=use_cache
+                    )
+
+            await asyncio.gather(*(fill(section) for section in missing))
+
+        return sections
+
+    async def refine_content(
+        self,
+        original_content: str,
+        refinement_instruction: str,
+        document_type: str
+    ) -> str:
+        """Refine existing content based on user instructions"""
+        prompt = build_refine_prompt(original_content, refinement_instruction, document_type)
+
+        try:
+            text = await self._call_model("refine", prompt)
+            return text.strip()
+        except AIServiceUnavailable:
+            raise
+        except Exception as e:
+            raise AIServiceError(f"Content refinement failed: {str(e)}")
+
+    async def _stream_model(self, operation: str, prompt: str) -> AsyncIterator[str]:
+        """Yield text chunks from one streamed backend call, recording it once it ends"""
+        started = None
+
+        async def open_stream():
+            nonlocal started
+            started = time.perf_counter()
+            try:
+                return await self.backend.open_stream(prompt)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                usage_recorder.record(operation, self.backend.model_name, started, error=e)
+                raise
+
+        stream = await upstream_guard.call(open_stream, estimate_tokens(prompt))
+        try:
+            async for text in stream:
+                yield text
+        except Exception as e:
+            usage_recorder.record(operation, self.backend.model_name, started, error=e)
+            raise
+        usage_recorder.record(
+            operation,
+            self.backend.model_name,
+            started,
+            stream.prompt_tokens,
+            stream.completion_tokens
+        )
+
+    async def _stream_text(self, operation: str, prompt: str, use_cache: bool = True) -> AsyncIterator[str]:
+        """Yield response text chunks as the backend streams them.
+
+        A cache hit is yielded as a single chunk; a completed stream is
+        written back to the cache unless it produced no text.
+        """
+        key = make_cache_key(self.backend.model_name, prompt)
+        if use_cache and settings.AI_CACHE_ENABLED:
+            cached = prompt_cache.get_memory(key)
+            if cached is None:
+                cached = await run_in_threadpool(prompt_cache.get, key)
+            if cached:
+                yield cached
+                return
+
+        parts = []
+        async for text in self._stream_model(operation, prompt):
+            parts.append(text)
+            yield text
+
+        text = "".join(parts)
+        if settings.AI_CACHE_ENABLED and text.strip():
+            await run_in_threadpool(prompt_cache.set, key, self.backend.model_name, text)
+
+    async def stream_section_content(
+        self,
+        topic: str,
+        section_title: str,
+        document_type: str,
+        additional_context: str = "",
+        use_cache: bool = True
+    ) -> AsyncIterator[str]:
+        """Stream content for a specific section/slide chunk by chunk"""
+        prompt = build_section_prompt(topic, section_title, document_type, additional_context)
+
+        try:
+            async for chunk in self._stream_text("section", prompt, use_cache):
+                yield chunk
+        except AIServiceUnavailable:
+            raise
+        except Exception as e:
+            raise AIServiceError(f"Content generation failed: {str(e)}")
+
+    async def stream_refined_content(
+        self,
+        original_content: str,
+        refinement_instruction: str,
+        document_type: str
+    ) -> AsyncIterator[str]:
+        """Stream refined content chunk by chunk"""
+        prompt = build_refine_prompt(original_content, refinement_instruction, document_type)
+
         try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            async for text in self._stream_model("refine", prompt):
+                yield text
+        except AIServiceUnavailable:
+            raise
         except Exception as e:
-            raise Exception(f"Content refinement failed: {str(e)}")
\ No newline at end of file
+            raise AIServiceError(f"Content refinement failed: {str(e)}")
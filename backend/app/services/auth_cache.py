@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.config import get_settings
+from app.models import User
+
+settings = get_settings()
+
+
+class TokenCache:
+    """Bounded cache of already verified JWT payloads.
+
+    An entry lives exactly as long as its token: it is dropped once the
+    token's ``exp`` passes, so a cached token can never outlive the
+    signature check it skipped.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[dict]:
+        with self._lock:
+            payload = self._entries.get(token)
+            if payload is None:
+                return None
+            if payload["exp"] <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return payload
+
+    def set(self, token: str, payload: dict):
+        if self.max_entries <= 0 or not isinstance(payload.get("exp"), (int, float)):
+            return
+        with self._lock:
+            self._entries[token] = payload
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class UserCache:
+    """Small TTL cache of user rows keyed by id, with an email index.
+
+    Stores column values, not ORM objects; every hit returns a fresh
+    detached User so requests never share an instance. Entries are dropped
+    whenever this process updates or deletes the user.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._ids_by_email: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: Optional[int] = None, email: Optional[str] = None) -> Optional[User]:
+        with self._lock:
+            if user_id is None and email is not None:
+                user_id = self._ids_by_email.get(email)
+            entry = self._entries.get(user_id) if user_id is not None else None
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if expires_at <= time.monotonic():
+                self._drop(user_id)
+                return None
+            self._entries.move_to_end(user_id)
+
+        user = User(**values)
+        make_transient_to_detached(user)
+        return user
+
+    def set(self, user: User):
+        if self.max_entries <= 0:
+            return
+        values = {column.key: getattr(user, column.key) for column in inspect(User).column_attrs}
+        with self._lock:
+            self._drop(user.id)
+            self._entries[user.id] = (time.monotonic() + self.ttl_seconds, values)
+            self._ids_by_email[user.email] = user.id
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._drop(user_id)
+
+    def _drop(self, user_id: int):
+        entry = self._entries.pop(user_id, None)
+        if entry is not None:
+            self._ids_by_email.pop(entry[1]["email"], None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._ids_by_email.clear()
+
+
+token_cache = TokenCache(max_entries=settings.AUTH_TOKEN_CACHE_MAX_ENTRIES)
+user_cache = UserCache(
+    ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS,
+    max_entries=settings.AUTH_USER_CACHE_MAX_ENTRIES
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target: User):
+    user_cache.invalidate(target.id)
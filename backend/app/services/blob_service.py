@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from sqlalchemy import delete, exists, select
+from sqlalchemy.orm import Session
+
+from app.models import ContentBlob, Refinement, Section
+
+
+class BlobService:
+    """Housekeeping for the content-addressed text store"""
+
+    @staticmethod
+    def collect_garbage(db: Session, unused_since: datetime) -> int:
+        """Delete blobs no section or refinement references that haven't been upserted since ``unused_since``.
+
+        Every write of a blob bumps its last_used_at, so a blob that a
+        concurrent request is about to reference again is left alone.
+        Returns the number of blobs deleted.
+        """
+        deleted = db.execute(
+            delete(ContentBlob)
+            .where(
+                ContentBlob.last_used_at < unused_since,
+                ~exists(select(Section.id).where(Section.content_hash == ContentBlob.hash)),
+                ~exists(select(Refinement.id).where(Refinement.content_hash == ContentBlob.hash))
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return deleted
@@ -0,0 +1,174 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models import AICacheEntry
+
+settings = get_settings()
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry"""
+    return _WHITESPACE_RE.sub(" ", prompt).strip()
+
+
+def make_cache_key(model: str, prompt: str) -> str:
+    """Cache key made of the model name plus a hash of the normalized prompt"""
+    digest = hashlib.sha256(normalize_prompt(prompt).encode("utf-8")).hexdigest()
+    return f"{model}:{digest}"
+
+
+class PromptCache:
+    """Two-tier prompt/response cache: an in-process LRU in front of a DB table.
+
+    Both tiers honour the same TTL. The memory tier evicts least recently
+    used entries past ``max_entries``; the DB tier drops expired rows and
+    then the least recently accessed rows past ``db_max_entries``. DB
+    eviction runs once every ``evict_every`` new rows (default: 5% of the
+    cap) rather than on each write, so the table may briefly hold that many
+    rows over the cap per process.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int,
+        max_entries: int,
+        db_max_entries: int,
+        session_factory=SessionLocal,
+        evict_every: Optional[int] = None
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.db_max_entries = db_max_entries
+        self.session_factory = session_factory
+        self.evict_every = evict_every or max(1, db_max_entries // 20)
+        # Starts due so each process sweeps the table on its first insert
+        self._inserts_since_evict = self.evict_every
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_memory(self, key: str) -> Optional[str]:
+        """Look up the in-process tier only (never touches the database)"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return value
+
+    def _set_memory(self, key: str, value: str, ttl_seconds: float):
+        with self._lock:
+            self._memory[key] = (time.monotonic() + ttl_seconds, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a cached response, falling back to the DB tier on a memory miss"""
+        value = self.get_memory(key)
+        if value is not None:
+            return value
+
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            entry = db.execute(
+                select(AICacheEntry).where(
+                    AICacheEntry.cache_key == key,
+                    AICacheEntry.expires_at > now
+                )
+            ).scalar_one_or_none()
+            if entry is None:
+                return None
+            entry.hit_count += 1
+            entry.last_accessed_at = now
+            value = entry.response_text
+            remaining = (entry.expires_at - now).total_seconds()
+            db.commit()
+        finally:
+            db.close()
+
+        self._set_memory(key, value, remaining)
+        return value
+
+    def set(self, key: str, model: str, value: str):
+        """Store a response in both tiers"""
+        self._set_memory(key, value, self.ttl_seconds)
+
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl_seconds)
+        db = self.session_factory()
+        try:
+            entry = db.execute(
+                select(AICacheEntry).where(AICacheEntry.cache_key == key)
+            ).scalar_one_or_none()
+            if entry is None:
+                db.add(AICacheEntry(
+                    cache_key=key,
+                    model=model,
+                    response_text=value,
+                    last_accessed_at=now,
+                    expires_at=expires_at
+                ))
+            else:
+                entry.response_text = value
+                entry.last_accessed_at = now
+                entry.expires_at = expires_at
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another worker stored the same prompt first
+                db.rollback()
+            else:
+                if entry is None and self._evict_due():
+                    self._evict(db, now)
+        finally:
+            db.close()
+
+    def _evict_due(self) -> bool:
+        """Count a new row; True once every ``evict_every`` of them"""
+        with self._lock:
+            self._inserts_since_evict += 1
+            if self._inserts_since_evict < self.evict_every:
+                return False
+            self._inserts_since_evict = 0
+            return True
+
+    def _evict(self, db, now: datetime):
+        """Drop expired rows, then the least recently used rows over the size cap"""
+        db.execute(delete(AICacheEntry).where(AICacheEntry.expires_at <= now))
+        count = db.execute(select(func.count(AICacheEntry.id))).scalar()
+        overflow = count - self.db_max_entries
+        if overflow > 0:
+            oldest = select(AICacheEntry.id).order_by(
+                AICacheEntry.last_accessed_at
+            ).limit(overflow)
+            db.execute(delete(AICacheEntry).where(AICacheEntry.id.in_(oldest)))
+        db.commit()
+
+    def clear_memory(self):
+        """Empty the in-process tier"""
+        with self._lock:
+            self._memory.clear()
+
+
+prompt_cache = PromptCache(
+    ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+    max_entries=settings.AI_CACHE_MEMORY_MAX_ENTRIES,
+    db_max_entries=settings.AI_CACHE_DB_MAX_ENTRIES
+)
@@ -1,8 +1,3 @@
-from docx import Document
-from docx.shared import Pt, Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from pptx import Presentation
-from pptx.util import Inches, Pt as PptPt
 from typing import List
 from io import BytesIO
 from app.models import Project, Section
@@ -13,6 +8,11 @@ class DocumentService:
     @staticmethod
     def generate_word_document(project: Project, sections: List[Section]) -> BytesIO:
         """Generate a Word document from project and sections"""
+        # Imported here so app startup doesn't pay for python-docx
+        from docx import Document
+        from docx.shared import Pt
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        
         doc = Document()
         
         # Add title
@@ -59,6 +59,10 @@ class DocumentService:
     @staticmethod
     def generate_powerpoint_presentation(project: Project, sections: List[Section]) -> BytesIO:
         """Generate a PowerPoint presentation from project and sections"""
+        # Imported here so app startup doesn't pay for python-pptx
+        from pptx import Presentation
+        from pptx.util import Inches, Pt as PptPt
+        
         prs = Presentation()
         prs.slide_width = Inches(10)
         prs.slide_height = Inches(7.5)
@@ -0,0 +1,101 @@
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import release_async_connection
+from app.models import Project
+from app.services.ai_service import AsyncAIService
+from app.services.project_service import AsyncProjectService
+from app.services.resilience import AIServiceUnavailable
+
+settings = get_settings()
+
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+
+
+class GenerationService:
+    """Multi-section generation workflows shared by the AI routes and background jobs"""
+
+    def __init__(self, ai_service: AsyncAIService):
+        self.ai_service = ai_service
+
+    async def generate_all_sections(
+        self,
+        db: AsyncSession,
+        project: Project,
+        use_cache: bool = True,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> dict:
+        """Generate every empty section of a project concurrently.
+
+        ``project`` must have its sections loaded (AsyncProjectService.get_project);
+        it is detached from ``db`` while the AI calls run.
+
+        The project is marked 'generating' while the calls run; results and
+        the final status are written back in one commit. Raises the first
+        error if no section could be generated.
+        """
+        project_id = project.id
+        topic = project.main_topic
+        document_type = project.document_type
+        pending = [
+            (section.id, section.title)
+            for section in sorted(project.sections, key=lambda x: x.position)
+            if not (section.content and section.content.strip())
+        ]
+        if not pending:
+            return {"status": project.status, "generated": [], "failed": []}
+
+        await AsyncProjectService.update_project_status(db, project_id, "generating")
+        # Don't hold a pooled connection during the AI calls
+        await release_async_connection(db)
+
+        semaphore = asyncio.Semaphore(max(1, settings.AI_GENERATION_CONCURRENCY))
+        done = 0
+
+        async def generate(section_title: str) -> str:
+            nonlocal done
+            try:
+                async with semaphore:
+                    return await self.ai_service.generate_section_content(
+                        topic,
+                        section_title,
+                        document_type,
+                        use_cache=use_cache
+                    )
+            finally:
+                done += 1
+                if on_progress is not None:
+                    await on_progress(done, len(pending))
+
+        results = await asyncio.gather(
+            *(generate(title) for _, title in pending),
+            return_exceptions=True
+        )
+
+        contents = {}
+        failed = []
+        for (section_id, _), result in zip(pending, results):
+            if isinstance(result, Exception):
+                failed.append({"section_id": section_id, "error": str(result)})
+            else:
+                contents[section_id] = result
+
+        # Only mark the document completed when every section came back
+        final_status = "draft" if failed else "completed"
+        await AsyncProjectService.save_generated_sections(db, project_id, contents, final_status)
+
+        if not contents:
+            errors = [result for result in results if isinstance(result, Exception)]
+            raise next((e for e in errors if isinstance(e, AIServiceUnavailable)), errors[0])
+
+        return {
+            "status": final_status,
+            "generated": [
+                {"section_id": section_id, "content": content}
+                for section_id, content in contents.items()
+            ],
+            "failed": failed
+        }
@@ -0,0 +1,405 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal, SessionLocal, release_async_connection
+from app.models import GenerationJob, Project
+from app.services.ai_service import AsyncAIService
+from app.services.generation_service import GenerationService
+from app.services.project_service import AsyncProjectService
+from app.services.resilience import AIServiceUnavailable
+from app.services.usage_service import set_usage_scope
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+ai_service = AsyncAIService()
+generation_service = GenerationService(ai_service)
+
+
+class JobAbort(Exception):
+    """A job failure that retrying cannot fix (e.g. the section was deleted)"""
+
+
+def _new_job(user_id: int, job_type: str, payload: dict, project_id: Optional[int]) -> GenerationJob:
+    return GenerationJob(
+        user_id=user_id,
+        project_id=project_id,
+        job_type=job_type,
+        payload=json.dumps(payload),
+        status="queued",
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+        run_after=datetime.utcnow()
+    )
+
+
+class JobService:
+    """Service for the durable generation job queue"""
+
+    @staticmethod
+    def claim_next(db: Session) -> Optional[GenerationJob]:
+        """Atomically move the oldest runnable job from 'queued' to 'running'.
+
+        The conditional UPDATE makes the claim safe when several processes
+        poll the same table.
+        """
+        while True:
+            now = datetime.utcnow()
+            candidate = db.query(GenerationJob.id).filter(
+                GenerationJob.status == "queued",
+                GenerationJob.run_after <= now
+            ).order_by(GenerationJob.id).first()
+            if candidate is None:
+                db.rollback()
+                return None
+
+            claimed = db.query(GenerationJob).filter(
+                GenerationJob.id == candidate.id,
+                GenerationJob.status == "queued"
+            ).update({
+                GenerationJob.status: "running",
+                GenerationJob.attempts: GenerationJob.attempts + 1,
+                GenerationJob.heartbeat_at: now
+            }, synchronize_session=False)
+            db.commit()
+            if claimed:
+                return db.get(GenerationJob, candidate.id)
+
+    @staticmethod
+    def heartbeat(db: Session, job_id: int):
+        """Record that the job's worker is still alive"""
+        db.query(GenerationJob).filter(
+            GenerationJob.id == job_id,
+            GenerationJob.status == "running"
+        ).update({GenerationJob.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+
+    @staticmethod
+    def set_progress(db: Session, job_id: int, progress: int):
+        """Update job progress (0-100)"""
+        db.query(GenerationJob).filter(GenerationJob.id == job_id).update(
+            {GenerationJob.progress: progress, GenerationJob.heartbeat_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.commit()
+
+    @staticmethod
+    def complete(db: Session, job_id: int, result: dict):
+        """Mark a job succeeded and store its result"""
+        now = datetime.utcnow()
+        db.query(GenerationJob).filter(GenerationJob.id == job_id).update({
+            GenerationJob.status: "succeeded",
+            GenerationJob.progress: 100,
+            GenerationJob.result: json.dumps(result),
+            GenerationJob.error: None,
+            GenerationJob.finished_at: now
+        }, synchronize_session=False)
+        db.commit()
+
+    @staticmethod
+    def fail(db: Session, job_id: int, error: str, retry_after: Optional[float] = None, retryable: bool = True):
+        """Requeue a failed job with a delay, or fail it for good once attempts run out"""
+        job = db.get(GenerationJob, job_id)
+        if job is None:
+            return
+        job.error = error
+        if retryable and job.attempts < job.max_attempts:
+            if retry_after is None:
+                retry_after = settings.JOB_RETRY_DELAY_SECONDS * (2 ** (job.attempts - 1))
+            job.status = "queued"
+            job.run_after = datetime.utcnow() + timedelta(seconds=retry_after)
+        else:
+            job.status = "failed"
+            job.finished_at = datetime.utcnow()
+            JobService._reset_project_status(db, job)
+        db.commit()
+
+    @staticmethod
+    def requeue(db: Session, job_id: int):
+        """Put an interrupted job back in the queue without spending an attempt"""
+        db.query(GenerationJob).filter(
+            GenerationJob.id == job_id,
+            GenerationJob.status == "running"
+        ).update({
+            GenerationJob.status: "queued",
+            GenerationJob.attempts: GenerationJob.attempts - 1,
+            GenerationJob.run_after: datetime.utcnow()
+        }, synchronize_session=False)
+        db.commit()
+
+    @staticmethod
+    def recover_stale(db: Session, stale_after_seconds: float) -> int:
+        """Requeue (or fail) running jobs whose worker stopped sending heartbeats"""
+        cutoff = datetime.utcnow() - timedelta(seconds=stale_after_seconds)
+        stale: List[GenerationJob] = db.query(GenerationJob).filter(
+            GenerationJob.status == "running",
+            or_(GenerationJob.heartbeat_at < cutoff, GenerationJob.heartbeat_at.is_(None))
+        ).all()
+        for job in stale:
+            job.error = "Worker stopped while the job was running"
+            if job.attempts < job.max_attempts:
+                job.status = "queued"
+                job.run_after = datetime.utcnow()
+            else:
+                job.status = "failed"
+                job.finished_at = datetime.utcnow()
+                JobService._reset_project_status(db, job)
+        db.commit()
+        return len(stale)
+
+    @staticmethod
+    def _reset_project_status(db: Session, job: GenerationJob):
+        """Don't leave a project stuck in 'generating' after its job gave up"""
+        if job.job_type == "generate_all" and job.project_id is not None:
+            db.query(Project).filter(
+                Project.id == job.project_id,
+                Project.status == "generating"
+            ).update({Project.status: "draft"}, synchronize_session=False)
+
+
+class AsyncJobService:
+    """Job queue calls made from request handlers.
+
+    Worker bookkeeping (claims, heartbeats, retries) stays on JobService and
+    runs in the thread pool, off the request path.
+    """
+
+    @staticmethod
+    async def enqueue(
+        db: AsyncSession,
+        user_id: int,
+        job_type: str,
+        payload: dict,
+        project_id: Optional[int] = None
+    ) -> GenerationJob:
+        """Queue a job for the background workers"""
+        job = _new_job(user_id, job_type, payload, project_id)
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    @staticmethod
+    async def get_job(db: AsyncSession, job_id: int, user_id: int) -> Optional[GenerationJob]:
+        """Get a job owned by a user"""
+        return (await db.execute(select(GenerationJob).where(
+            GenerationJob.id == job_id,
+            GenerationJob.user_id == user_id
+        ))).scalars().first()
+
+
+def _with_session(fn, *args, **kwargs):
+    db = SessionLocal()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+def _claim_snapshot(db: Session) -> Optional[dict]:
+    job = JobService.claim_next(db)
+    if job is None:
+        return None
+    return {
+        "id": job.id,
+        "user_id": job.user_id,
+        "project_id": job.project_id,
+        "job_type": job.job_type,
+        "payload": json.loads(job.payload)
+    }
+
+
+class JobWorkerPool:
+    """In-process asyncio workers that drain the generation job table"""
+
+    def __init__(self, worker_count: int, poll_interval: float, heartbeat_interval: float, stale_after: float):
+        self.worker_count = worker_count
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def start(self):
+        """Recover jobs orphaned by a dead process, then start the workers"""
+        if self._tasks or self.worker_count <= 0:
+            return
+        self._wakeup = asyncio.Event()
+        recovered = await run_in_threadpool(_with_session, JobService.recover_stale, self.stale_after)
+        if recovered:
+            logger.info("Recovered %d stale generation job(s)", recovered)
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.worker_count)]
+        self._tasks.append(asyncio.ensure_future(self._reaper()))
+
+    async def stop(self):
+        """Cancel the workers; interrupted jobs go back to the queue"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        """Wake idle workers after a job was enqueued"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _worker(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                job = await run_in_threadpool(_with_session, _claim_snapshot)
+            except Exception:
+                logger.exception("Failed to claim a generation job")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._run(job)
+            except Exception:
+                # Keep the worker alive; the job is recovered once its heartbeat goes stale
+                logger.exception("Failed to run generation job %s", job["id"])
+
+    async def _reaper(self):
+        while True:
+            await asyncio.sleep(self.stale_after / 2)
+            try:
+                await run_in_threadpool(_with_session, JobService.recover_stale, self.stale_after)
+            except Exception:
+                logger.exception("Failed to recover stale generation jobs")
+
+    async def _heartbeat(self, job_id: int):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await run_in_threadpool(_with_session, JobService.heartbeat, job_id)
+            except Exception:
+                # Retried next interval; the job only goes stale after several misses
+                logger.exception("Failed to record heartbeat for generation job %s", job_id)
+
+    async def _run(self, job: dict):
+        job_id = job["id"]
+        heartbeat = asyncio.ensure_future(self._heartbeat(job_id))
+        set_usage_scope(job["user_id"], job["project_id"])
+        try:
+            handler = JOB_HANDLERS[job["job_type"]]
+            result = await handler(job_id, job["user_id"], job["payload"])
+        except asyncio.CancelledError:
+            # Shielded so a second cancellation can't interrupt the write; if it
+            # fails the job is left running for recover_stale on the next start
+            try:
+                await asyncio.shield(run_in_threadpool(_with_session, JobService.requeue, job_id))
+            except Exception:
+                logger.exception("Failed to requeue generation job %s", job_id)
+            raise
+        except JobAbort as e:
+            await self._record(JobService.fail, job_id, str(e), None, False)
+        except AIServiceUnavailable as e:
+            await self._record(JobService.fail, job_id, str(e), e.retry_after)
+        except Exception as e:
+            logger.exception("Generation job %s failed", job_id)
+            await self._record(JobService.fail, job_id, str(e))
+        else:
+            await self._record(JobService.complete, job_id, result)
+        finally:
+            heartbeat.cancel()
+
+    @staticmethod
+    async def _record(outcome, job_id: int, *args):
+        """Write a job's outcome; if that fails the job stays running and the reaper retries it"""
+        try:
+            await run_in_threadpool(_with_session, outcome, job_id, *args)
+        except Exception:
+            logger.exception("Failed to record the outcome of generation job %s", job_id)
+
+
+async def _generate_section(job_id: int, user_id: int, payload: dict) -> dict:
+    async with AsyncSessionLocal() as db:
+        project = await AsyncProjectService.get_project(db, payload["project_id"], user_id)
+        if not project:
+            raise JobAbort("Project not found")
+        section = await AsyncProjectService.get_section(db, payload["section_id"])
+        if not section or section.project_id != project.id:
+            raise JobAbort("Section not found")
+
+        # Don't hold a pooled connection during the AI call
+        await release_async_connection(db)
+
+        content = await ai_service.generate_section_content(
+            project.main_topic,
+            section.title,
+            project.document_type,
+            use_cache=payload.get("use_cache", True)
+        )
+        await AsyncProjectService.save_section_content(db, section, content)
+        return {"content": content}
+
+
+async def _refine_section(job_id: int, user_id: int, payload: dict) -> dict:
+    async with AsyncSessionLocal() as db:
+        section = await AsyncProjectService.get_section(db, payload["section_id"])
+        if not section:
+            raise JobAbort("Section not found")
+        project = await AsyncProjectService.get_project(db, section.project_id, user_id)
+        if not project:
+            raise JobAbort("Access denied")
+        if not section.content:
+            raise JobAbort("Section has no content to refine")
+
+        # Don't hold a pooled connection during the AI call
+        await release_async_connection(db)
+
+        refined_content = await ai_service.refine_content(
+            section.content,
+            payload["refinement_instruction"],
+            project.document_type
+        )
+        await AsyncProjectService.save_section_content(
+            db,
+            section,
+            refined_content,
+            refinement_prompt=payload["refinement_instruction"]
+        )
+        return {"refined_content": refined_content}
+
+
+async def _generate_all(job_id: int, user_id: int, payload: dict) -> dict:
+    async with AsyncSessionLocal() as db:
+        project = await AsyncProjectService.get_project(db, payload["project_id"], user_id)
+        if not project:
+            raise JobAbort("Project not found")
+
+        async def on_progress(done: int, total: int):
+            await run_in_threadpool(_with_session, JobService.set_progress, job_id, done * 100 // total)
+
+        return await generation_service.generate_all_sections(
+            db,
+            project,
+            use_cache=payload.get("use_cache", True),
+            on_progress=on_progress
+        )
+
+
+JOB_HANDLERS = {
+    "generate_section": _generate_section,
+    "refine_section": _refine_section,
+    "generate_all": _generate_all,
+}
+
+job_workers = JobWorkerPool(
+    worker_count=settings.JOB_WORKER_COUNT,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+    heartbeat_interval=settings.JOB_HEARTBEAT_SECONDS,
+    stale_after=settings.JOB_STALE_AFTER_SECONDS
+)
@@ -0,0 +1,246 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import AsyncIterator, Optional, Protocol
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+@dataclass
+class LLMResponse:
+    """Text returned by a backend for one prompt, with token usage when the backend reports it"""
+    text: str
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+
+
+class LLMStream:
+    """Async iterator over streamed text chunks.
+
+    Token usage is only known once the stream has been consumed.
+    """
+
+    def __init__(self):
+        self.chunks: AsyncIterator[str] = None
+        self.prompt_tokens: Optional[int] = None
+        self.completion_tokens: Optional[int] = None
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self.chunks.__aiter__()
+
+
+class LLMBackend(Protocol):
+    """Interface AsyncAIService depends on for text generation"""
+
+    model_name: str
+
+    def generate(self, prompt: str, generation_config: Optional[dict] = None) -> LLMResponse:
+        """Generate a full response, blocking the calling thread"""
+        ...
+
+    async def generate_async(self, prompt: str, generation_config: Optional[dict] = None) -> LLMResponse:
+        """Generate a full response without blocking the event loop"""
+        ...
+
+    async def open_stream(self, prompt: str) -> LLMStream:
+        """Start a streamed generation and return an iterator over its text chunks.
+
+        Awaiting this performs the upstream request, so connection and quota
+        errors surface here rather than on the first iteration.
+        """
+        ...
+
+
+def _gemini_usage(response) -> dict:
+    """Token counts from a Gemini response's usage metadata, if present"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return {}
+    return {
+        "prompt_tokens": usage.prompt_token_count or None,
+        "completion_tokens": usage.candidates_token_count or None
+    }
+
+
+class GeminiBackend:
+    """Google Gemini via the google-generativeai SDK"""
+
+    def __init__(self, api_key: str, model_name: str):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt: str, generation_config: Optional[dict] = None) -> LLMResponse:
+        response = self.model.generate_content(prompt, generation_config=generation_config)
+        return LLMResponse(text=response.text, **_gemini_usage(response))
+
+    async def generate_async(self, prompt: str, generation_config: Optional[dict] = None) -> LLMResponse:
+        response = await self.model.generate_content_async(prompt, generation_config=generation_config)
+        return LLMResponse(text=response.text, **_gemini_usage(response))
+
+    async def open_stream(self, prompt: str) -> LLMStream:
+        response = await self.model.generate_content_async(prompt, stream=True)
+        stream = LLMStream()
+
+        async def chunks():
+            async for chunk in response:
+                # Usage metadata is cumulative; the last chunk carries the totals
+                usage = _gemini_usage(chunk)
+                if usage:
+                    stream.prompt_tokens = usage["prompt_tokens"]
+                    stream.completion_tokens = usage["completion_tokens"]
+                # Chunks without candidate parts (e.g. safety metadata) carry no text
+                text = chunk.text if chunk.parts else ""
+                if text:
+                    yield text
+
+        stream.chunks = chunks()
+        return stream
+
+
+class FakeBackendError(Exception):
+    """Injected failure from FakeBackend; looks like a transient upstream 503"""
+    code = 503
+
+
+_OUTLINE_RE = re.compile(r"Generate (\d+) (?:section|slide) titles")
+_DOCUMENT_RE = re.compile(r"exactly (\d+) (?:section|slide)s")
+_WORDS = (
+    "analysis approach context data design development evidence framework growth impact "
+    "insight model outcome performance practice process quality research result strategy "
+    "structure system team technology trend value"
+).split()
+
+
+class FakeBackend:
+    """Offline backend returning deterministic text for load testing.
+
+    The response is derived only from the prompt. Latency, jitter and
+    injected errors are drawn from a seeded RNG, so a run with the same seed
+    and call order is reproducible. Outline and structured document prompts
+    get responses in the shape the parsers expect.
+    """
+
+    model_name = "fake"
+
+    def __init__(
+        self,
+        latency_ms: int = 0,
+        latency_jitter_ms: int = 0,
+        error_rate: float = 0.0,
+        seed: int = 0
+    ):
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def _next_call(self):
+        """Draw this call's latency (seconds) and whether it should fail"""
+        with self._rng_lock:
+            jitter = self._rng.uniform(-self.latency_jitter_ms, self.latency_jitter_ms)
+            fail = self._rng.random() < self.error_rate
+        return max(0.0, (self.latency_ms + jitter) / 1000), fail
+
+    @staticmethod
+    def _words(seed: str, count: int) -> list:
+        digest = hashlib.sha256(seed.encode("utf-8")).digest()
+        return [_WORDS[digest[i % len(digest)] % len(_WORDS)] for i in range(count)]
+
+    def _respond(self, prompt: str, generation_config: Optional[dict]) -> str:
+        document = _DOCUMENT_RE.search(prompt)
+        if document and generation_config and generation_config.get("response_mime_type") == "application/json":
+            count = int(document.group(1))
+            return json.dumps({"sections": [
+                {
+                    "title": " ".join(self._words(f"{prompt}:title:{i}", 3)).title(),
+                    "content": " ".join(self._words(f"{prompt}:content:{i}", 60)).capitalize() + "."
+                }
+                for i in range(count)
+            ]})
+
+        outline = _OUTLINE_RE.search(prompt)
+        if outline:
+            count = int(outline.group(1))
+            return "\n".join(
+                " ".join(self._words(f"{prompt}:{i}", 3)).title() for i in range(count)
+            )
+
+        paragraphs = [
+            " ".join(self._words(f"{prompt}:{i}", 50)).capitalize() + "."
+            for i in range(3)
+        ]
+        return "\n\n".join(paragraphs)
+
+    def _response(self, prompt: str, generation_config: Optional[dict]) -> LLMResponse:
+        text = self._respond(prompt, generation_config)
+        # Same ~4 characters per token rule of thumb the rate limiter uses
+        return LLMResponse(text=text, prompt_tokens=len(prompt) // 4, completion_tokens=len(text) // 4)
+
+    def generate(self, prompt: str, generation_config: Optional[dict] = None) -> LLMResponse:
+        delay, fail = self._next_call()
+        time.sleep(delay)
+        if fail:
+            raise FakeBackendError("503 Injected fake backend failure")
+        return self._response(prompt, generation_config)
+
+    async def generate_async(self, prompt: str, generation_config: Optional[dict] = None) -> LLMResponse:
+        delay, fail = self._next_call()
+        await asyncio.sleep(delay)
+        if fail:
+            raise FakeBackendError("503 Injected fake backend failure")
+        return self._response(prompt, generation_config)
+
+    async def open_stream(self, prompt: str) -> LLMStream:
+        delay, fail = self._next_call()
+        # Spend a fifth of the latency before the first chunk, the rest while streaming
+        await asyncio.sleep(delay / 5)
+        if fail:
+            raise FakeBackendError("503 Injected fake backend failure")
+        response = self._response(prompt, None)
+        words = response.text.split(" ")
+        chunk_size = 8
+        chunk_count = max(1, (len(words) + chunk_size - 1) // chunk_size)
+        stream = LLMStream()
+
+        async def chunks():
+            for i in range(0, len(words), chunk_size):
+                await asyncio.sleep(delay * 4 / 5 / chunk_count)
+                yield " ".join(words[i:i + chunk_size]) + (" " if i + chunk_size < len(words) else "")
+            stream.prompt_tokens = response.prompt_tokens
+            stream.completion_tokens = response.completion_tokens
+
+        stream.chunks = chunks()
+        return stream
+
+
+def create_llm_backend(name: str = None) -> LLMBackend:
+    """Build the backend selected by Settings.AI_BACKEND"""
+    name = (name or settings.AI_BACKEND).lower()
+    if name == "gemini":
+        return GeminiBackend(settings.GEMINI_API_KEY, settings.GEMINI_MODEL)
+    if name == "fake":
+        return FakeBackend(
+            latency_ms=settings.AI_FAKE_LATENCY_MS,
+            latency_jitter_ms=settings.AI_FAKE_LATENCY_JITTER_MS,
+            error_rate=settings.AI_FAKE_ERROR_RATE,
+            seed=settings.AI_FAKE_SEED
+        )
+    raise ValueError(f"Unknown AI backend: {name}")
+
+
+@lru_cache()
+def get_llm_backend() -> LLMBackend:
+    """Process-wide backend, built on first use rather than at import time"""
+    return create_llm_backend()
@@ -0,0 +1,85 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+from app.config import get_settings
+from app.utils import get_password_hash, verify_and_rehash
+
+settings = get_settings()
+
+
+def _warm_worker():
+    """No-op; running it makes a worker process import this module and passlib"""
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hashing requests are already waiting"""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated process pool.
+
+    Keeps CPU-bound hashing off the event loop and the request threadpool,
+    so a burst of logins can't starve other endpoints. At most
+    ``max_pending`` calls may be queued or running; beyond that callers get
+    PasswordHasherBusy instead of waiting.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned, not forked: the server process has threads running
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            raise PasswordHasherBusy("Too many sign-in requests, try again shortly")
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool for the next call
+            self._executor = None
+            raise PasswordHasherBusy("Password hashing is restarting, try again shortly")
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify_and_rehash(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password; also returns a new hash when the stored one needs an upgrade"""
+        return await self._run(verify_and_rehash, password, hashed_password)
+
+    def start(self):
+        """Spawn and warm the worker processes ahead of the first login"""
+        executor = self._get_executor()
+        for _ in range(self.workers):
+            executor.submit(_warm_worker)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
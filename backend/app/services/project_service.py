@@ -1,7 +1,177 @@
-from sqlalchemy.orm import Session
-from app.models import Project, Section, Refinement, Comment, Feedback
-from app.schemas import ProjectCreate, SectionCreate
-from typing import List, Optional
+import base64
+from datetime import datetime
+from sqlalchemy import and_, delete, distinct, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from app.database import dialect_insert
+from app.models import Project, Section, Refinement, Comment, ContentBlob, Feedback, SectionFeedbackCount, content_hash
+from app.schemas import ProjectCreate, SectionCreate, SectionOperation
+from app.services.search_service import SearchIndex, project_key, section_key
+from typing import Dict, List, Optional, Tuple
+
+# Projects are listed newest first; a cursor is the (updated_at, id) of the last one returned
+ProjectCursor = Tuple[datetime, int]
+
+def _paginate(statement, limit: Optional[int], after: Optional[ProjectCursor]):
+    """Apply keyset pagination on (updated_at, id), newest first"""
+    if after is not None:
+        updated_at, project_id = after
+        statement = statement.where(or_(
+            Project.updated_at < updated_at,
+            and_(Project.updated_at == updated_at, Project.id < project_id)
+        ))
+    statement = statement.order_by(Project.updated_at.desc(), Project.id.desc())
+    if limit is not None:
+        # One extra row tells us whether there is a next page
+        statement = statement.limit(limit + 1)
+    return statement
+
+def _split_page(rows: list, limit: Optional[int]) -> Tuple[list, Optional[ProjectCursor]]:
+    """Drop the look-ahead row and derive the next cursor from the last row kept"""
+    if limit is None or len(rows) <= limit:
+        return list(rows), None
+    rows = rows[:limit]
+    return rows, (rows[-1].updated_at, rows[-1].id)
+
+def _user_projects_statement(user_id: int, limit: Optional[int], after: Optional[ProjectCursor]):
+    statement = select(Project).options(selectinload(Project.sections)).where(Project.user_id == user_id)
+    return _paginate(statement, limit, after)
+
+def _project_summaries_statement(user_id: int, limit: Optional[int], after: Optional[ProjectCursor]):
+    section_count = (
+        select(func.count(Section.id))
+        .where(Section.project_id == Project.id)
+        .correlate(Project)
+        .scalar_subquery()
+    )
+    generated_section_count = (
+        select(func.count(Section.id))
+        .join(ContentBlob, ContentBlob.hash == Section.content_hash)
+        .where(Section.project_id == Project.id, ContentBlob.is_blank.is_(False))
+        .correlate(Project)
+        .scalar_subquery()
+    )
+    statement = select(
+        Project.id,
+        Project.user_id,
+        Project.name,
+        Project.document_type,
+        Project.main_topic,
+        Project.status,
+        Project.created_at,
+        Project.updated_at,
+        section_count.label("section_count"),
+        generated_section_count.label("generated_section_count")
+    ).where(Project.user_id == user_id)
+    return _paginate(statement, limit, after)
+
+def _feedback_vote_statements(db, section_id: int, user_id: int, feedback_type: str):
+    """(insert a new vote, flip an existing one); each returns a row only if it changed something"""
+    insert_vote = (
+        dialect_insert(db.get_bind())(Feedback)
+        .values(section_id=section_id, user_id=user_id, feedback_type=feedback_type)
+        .on_conflict_do_nothing(index_elements=["section_id", "user_id"])
+        .returning(Feedback.id)
+    )
+    flip_vote = (
+        update(Feedback)
+        .where(
+            Feedback.section_id == section_id,
+            Feedback.user_id == user_id,
+            Feedback.feedback_type != feedback_type
+        )
+        .values(feedback_type=feedback_type)
+        .returning(Feedback.id)
+        .execution_options(synchronize_session=False)
+    )
+    return insert_vote, flip_vote
+
+def _feedback_delta(feedback_type: str, inserted: bool, flipped: bool) -> Tuple[int, int]:
+    """(like, dislike) counter changes for a vote"""
+    step = 1 if feedback_type == "like" else -1
+    if inserted:
+        return (1, 0) if feedback_type == "like" else (0, 1)
+    if flipped:
+        return step, -step
+    return 0, 0
+
+def _feedback_count_statement(db, section_id: int, likes: int, dislikes: int):
+    """Add to a section's counters, creating its row on first feedback; returns the new totals"""
+    statement = dialect_insert(db.get_bind())(SectionFeedbackCount).values(
+        section_id=section_id,
+        like_count=max(likes, 0),
+        dislike_count=max(dislikes, 0)
+    )
+    return statement.on_conflict_do_update(
+        index_elements=["section_id"],
+        set_={
+            "like_count": SectionFeedbackCount.like_count + likes,
+            "dislike_count": SectionFeedbackCount.dislike_count + dislikes
+        }
+    ).returning(SectionFeedbackCount.like_count, SectionFeedbackCount.dislike_count)
+
+def _feedback_counts_statement(project_id: int, user_id: int):
+    """Counters for every section of a project, with the user's own vote"""
+    return (
+        select(
+            Section.id.label("section_id"),
+            func.coalesce(SectionFeedbackCount.like_count, 0).label("like_count"),
+            func.coalesce(SectionFeedbackCount.dislike_count, 0).label("dislike_count"),
+            Feedback.feedback_type.label("user_feedback")
+        )
+        .outerjoin(SectionFeedbackCount, SectionFeedbackCount.section_id == Section.id)
+        .outerjoin(Feedback, and_(Feedback.section_id == Section.id, Feedback.user_id == user_id))
+        .where(Section.project_id == project_id)
+        .order_by(Section.position)
+    )
+
+def _content_rows(contents: Dict[int, str]) -> Tuple[List[dict], List[dict]]:
+    """(blob rows to upsert, section updates) for bulk-writing section content"""
+    blobs = {}
+    for content in contents.values():
+        row = ContentBlob.row(content)
+        blobs[row["hash"]] = row
+    updates = [
+        {"id": section_id, "content_hash": content_hash(content)}
+        for section_id, content in contents.items()
+    ]
+    return list(blobs.values()), updates
+
+def _new_project(user_id: int, project_data: ProjectCreate) -> Project:
+    """Build a project and its sections, ready to be added to a session"""
+    project = Project(
+        user_id=user_id,
+        name=project_data.name,
+        document_type=project_data.document_type,
+        main_topic=project_data.main_topic,
+        status="draft"
+    )
+    # Assigned even when empty, so reading project.sections never lazy loads
+    project.sections = [
+        Section(title=section_data.title, position=section_data.position, content=section_data.content)
+        for section_data in project_data.sections or []
+    ]
+    return project
+
+def _project_documents(project: Project) -> List[dict]:
+    """Search documents for a flushed project and its sections"""
+    return [SearchIndex.project_document(project.id, project.name, project.main_topic)] + [
+        SearchIndex.section_document(project.id, section.id, section.title, section.content)
+        for section in project.sections
+    ]
+
+def _section_document(section: Section) -> dict:
+    return SearchIndex.section_document(section.project_id, section.id, section.title, section.content)
+
+def _generated_documents(titles, project_id: int, contents: Dict[int, str]) -> List[dict]:
+    """Search documents for sections given as (id, title) rows, with their new content"""
+    return [
+        SearchIndex.section_document(project_id, row.id, row.title, contents[row.id])
+        for row in titles
+    ]
+
+def _project_keys(project_id: int, section_ids: List[int]) -> List[int]:
+    return [project_key(project_id)] + [section_key(section_id) for section_id in section_ids]
 
 class ProjectService:
     """Service for project and section management"""
@@ -9,36 +179,51 @@ class ProjectService:
     @staticmethod
     def create_project(db: Session, user_id: int, project_data: ProjectCreate) -> Project:
         """Create a new project with sections"""
-        # Create project
-        project = Project(
-            user_id=user_id,
-            name=project_data.name,
-            document_type=project_data.document_type,
-            main_topic=project_data.main_topic,
-            status="draft"
-        )
+        project = _new_project(user_id, project_data)
         db.add(project)
-        db.flush()  # Get project.id without committing
-        
-        # Create sections if provided
-        if project_data.sections:
-            for section_data in project_data.sections:
-                section = Section(
-                    project_id=project.id,
-                    title=section_data.title,
-                    position=section_data.position,
-                    content=section_data.content
-                )
-                db.add(section)
-        
+        db.flush()
+        db.execute(*SearchIndex.upsert(db, _project_documents(project)))
         db.commit()
         db.refresh(project)
         return project
     
     @staticmethod
-    def get_user_projects(db: Session, user_id: int) -> List[Project]:
-        """Get all projects for a user"""
-        return db.query(Project).filter(Project.user_id == user_id).all()
+    def encode_cursor(updated_at: datetime, project_id: int) -> str:
+        """Opaque pagination cursor for the position after a project"""
+        raw = f"{updated_at.isoformat()}|{project_id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> ProjectCursor:
+        """Inverse of encode_cursor; raises ValueError for a malformed cursor"""
+        try:
+            updated_at, project_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            return datetime.fromisoformat(updated_at), int(project_id)
+        except Exception:
+            raise ValueError("Invalid cursor")
+    
+    @staticmethod
+    def get_user_projects(
+        db: Session,
+        user_id: int,
+        limit: Optional[int] = None,
+        after: Optional[ProjectCursor] = None
+    ) -> Tuple[List[Project], Optional[ProjectCursor]]:
+        """Get a page of a user's projects with their sections loaded in one extra query"""
+        projects = db.execute(_user_projects_statement(user_id, limit, after)).scalars().all()
+        return _split_page(projects, limit)
+    
+    @staticmethod
+    def get_user_project_summaries(
+        db: Session,
+        user_id: int,
+        limit: Optional[int] = None,
+        after: Optional[ProjectCursor] = None
+    ) -> Tuple[List[dict], Optional[ProjectCursor]]:
+        """Get a page of a user's projects without sections, with section counts computed in SQL"""
+        rows = db.execute(_project_summaries_statement(user_id, limit, after)).all()
+        rows, next_cursor = _split_page(rows, limit)
+        return [row._asdict() for row in rows], next_cursor
     
     @staticmethod
     def get_project(db: Session, project_id: int, user_id: int) -> Optional[Project]:
@@ -68,6 +253,8 @@ class ProjectService:
             content=section_data.content
         )
         db.add(section)
+        db.flush()
+        db.execute(*SearchIndex.upsert(db, [_section_document(section)]))
         db.commit()
         db.refresh(section)
         return section
@@ -78,10 +265,27 @@ class ProjectService:
         section = db.query(Section).filter(Section.id == section_id).first()
         if section:
             section.content = content
+            db.execute(*SearchIndex.upsert(db, [_section_document(section)]))
             db.commit()
             db.refresh(section)
         return section
     
+    @staticmethod
+    def save_generated_sections(db: Session, project_id: int, contents: Dict[int, str], status: str):
+        """Write generated content for many sections and the project status in one commit"""
+        if contents:
+            # Identical texts (e.g. cached AI output) share one blob
+            blobs, updates = _content_rows(contents)
+            db.execute(ContentBlob.upsert_statement(db.get_bind()), blobs)
+            db.execute(update(Section), updates)
+            db.execute(*SearchIndex.upsert(db, _generated_documents(
+                db.execute(select(Section.id, Section.title).where(Section.id.in_(contents))).all(),
+                project_id,
+                contents
+            )))
+        db.execute(update(Project).where(Project.id == project_id).values(status=status))
+        db.commit()
+    
     @staticmethod
     def add_refinement(db: Session, section_id: int, prompt: str, refined_content: str) -> Refinement:
         """Save a refinement"""
@@ -96,29 +300,21 @@ class ProjectService:
         return refinement
     
     @staticmethod
-    def add_feedback(db: Session, section_id: int, user_id: int, feedback_type: str) -> Feedback:
-        """Add like/dislike feedback"""
-        # Check if feedback already exists
-        existing = db.query(Feedback).filter(
-            Feedback.section_id == section_id,
-            Feedback.user_id == user_id
-        ).first()
-        
-        if existing:
-            existing.feedback_type = feedback_type
-            db.commit()
-            db.refresh(existing)
-            return existing
+    def add_feedback(db: Session, section_id: int, user_id: int, feedback_type: str) -> dict:
+        """Record a user's like/dislike (one vote per user per section) and return the section's totals"""
+        insert_vote, flip_vote = _feedback_vote_statements(db, section_id, user_id, feedback_type)
+        inserted = db.execute(insert_vote).first() is not None
+        flipped = not inserted and db.execute(flip_vote).first() is not None
+        likes, dislikes = _feedback_delta(feedback_type, inserted, flipped)
         
-        feedback = Feedback(
-            section_id=section_id,
-            user_id=user_id,
-            feedback_type=feedback_type
-        )
-        db.add(feedback)
+        counts = db.execute(_feedback_count_statement(db, section_id, likes, dislikes)).one()
         db.commit()
-        db.refresh(feedback)
-        return feedback
+        return {
+            "section_id": section_id,
+            "like_count": counts.like_count,
+            "dislike_count": counts.dislike_count,
+            "user_feedback": feedback_type
+        }
     
     @staticmethod
     def add_comment(db: Session, section_id: int, user_id: int, comment_text: str) -> Comment:
@@ -142,7 +338,333 @@ class ProjectService:
         ).first()
         
         if project:
+            section_ids = db.execute(select(Section.id).where(Section.project_id == project_id)).scalars().all()
+            db.execute(*SearchIndex.delete(db, _project_keys(project_id, section_ids)))
             db.delete(project)
             db.commit()
             return True
-        return False
\ No newline at end of file
+        return False
+
+class AsyncProjectService:
+    """Async counterpart of ProjectService for request handlers and background jobs.
+    
+    Async sessions can't lazy load, so anything a caller reads off a returned
+    object (e.g. ``project.sections``) is loaded up front.
+    """
+    
+    @staticmethod
+    async def create_project(db: AsyncSession, user_id: int, project_data: ProjectCreate) -> Project:
+        """Create a new project with sections"""
+        project = _new_project(user_id, project_data)
+        db.add(project)
+        await db.flush()
+        await db.execute(*SearchIndex.upsert(db, _project_documents(project)))
+        await db.commit()
+        return await AsyncProjectService.get_project(db, project.id, user_id, populate_existing=True)
+    
+    @staticmethod
+    async def get_user_projects(
+        db: AsyncSession,
+        user_id: int,
+        limit: Optional[int] = None,
+        after: Optional[ProjectCursor] = None
+    ) -> Tuple[List[Project], Optional[ProjectCursor]]:
+        """Get a page of a user's projects with their sections loaded in one extra query"""
+        projects = (await db.execute(_user_projects_statement(user_id, limit, after))).scalars().all()
+        return _split_page(projects, limit)
+    
+    @staticmethod
+    async def get_user_project_summaries(
+        db: AsyncSession,
+        user_id: int,
+        limit: Optional[int] = None,
+        after: Optional[ProjectCursor] = None
+    ) -> Tuple[List[dict], Optional[ProjectCursor]]:
+        """Get a page of a user's projects without sections, with section counts computed in SQL"""
+        rows = (await db.execute(_project_summaries_statement(user_id, limit, after))).all()
+        rows, next_cursor = _split_page(rows, limit)
+        return [row._asdict() for row in rows], next_cursor
+    
+    @staticmethod
+    async def get_project(
+        db: AsyncSession,
+        project_id: int,
+        user_id: int,
+        populate_existing: bool = False,
+        with_sections: bool = True
+    ) -> Optional[Project]:
+        """Get a specific project, with its sections unless ``with_sections`` is False"""
+        statement = select(Project).where(
+            Project.id == project_id,
+            Project.user_id == user_id
+        )
+        if with_sections:
+            statement = statement.options(selectinload(Project.sections))
+        if populate_existing:
+            statement = statement.execution_options(populate_existing=True)
+        return (await db.execute(statement)).scalars().first()
+    
+    @staticmethod
+    async def get_project_version(db: AsyncSession, project_id: int, user_id: int) -> Optional[tuple]:
+        """Values that change whenever GET /projects/{id} would return something different.
+        
+        (project updated_at, section count, latest section updated_at), or
+        None if the user has no such project. One indexed aggregate query.
+        """
+        return (await db.execute(
+            select(Project.updated_at, func.count(Section.id), func.max(Section.updated_at))
+            .select_from(Project)
+            .outerjoin(Section, Section.project_id == Project.id)
+            .where(Project.id == project_id, Project.user_id == user_id)
+            .group_by(Project.id)
+        )).first()
+    
+    @staticmethod
+    async def get_user_projects_version(db: AsyncSession, user_id: int) -> tuple:
+        """get_project_version for all of a user's projects at once (GET /projects)"""
+        return tuple((await db.execute(
+            select(
+                func.count(distinct(Project.id)),
+                func.count(Section.id),
+                func.max(Project.updated_at),
+                func.max(Section.updated_at)
+            )
+            .select_from(Project)
+            .outerjoin(Section, Section.project_id == Project.id)
+            .where(Project.user_id == user_id)
+        )).one())
+    
+    @staticmethod
+    async def get_section(db: AsyncSession, section_id: int) -> Optional[Section]:
+        """Get a section by id"""
+        return await db.get(Section, section_id)
+    
+    @staticmethod
+    async def update_project_status(db: AsyncSession, project_id: int, status: str):
+        """Update project status"""
+        project = await db.get(Project, project_id)
+        if project:
+            project.status = status
+            # No refresh: it would start a transaction and hold a pooled connection
+            await db.commit()
+        return project
+    
+    @staticmethod
+    async def add_section(db: AsyncSession, project_id: int, section_data: SectionCreate) -> Section:
+        """Add a section to a project"""
+        section = Section(
+            project_id=project_id,
+            title=section_data.title,
+            position=section_data.position,
+            content=section_data.content
+        )
+        db.add(section)
+        await db.flush()
+        await db.execute(*SearchIndex.upsert(db, [_section_document(section)]))
+        await db.commit()
+        await db.refresh(section)
+        return section
+    
+    @staticmethod
+    async def apply_section_operations(
+        db: AsyncSession,
+        project_id: int,
+        operations: List[SectionOperation]
+    ) -> List[Section]:
+        """Add, move, retitle and delete sections in one transaction.
+        
+        Operations are applied in order to the section list in memory, then
+        written with at most one DELETE, one UPDATE batch and one INSERT batch.
+        Positions come out dense (0..n-1). Raises ValueError for an operation
+        on a section that isn't (or is no longer) in the project.
+        """
+        # Serialize concurrent batches on the same project (no-op on SQLite,
+        # which only has one writer anyway)
+        await db.execute(select(Project.id).where(Project.id == project_id).with_for_update())
+        rows = (await db.execute(
+            select(Section.id, Section.title, Section.position)
+            .where(Section.project_id == project_id)
+            .order_by(Section.position, Section.id)
+        )).all()
+        
+        # Existing sections are {"id", "title"}; new ones carry their content instead of an id
+        order = [{"id": row.id, "title": row.title} for row in rows]
+        original = {row.id: (row.title, row.position) for row in rows}
+        
+        def index_of(section_id: int) -> int:
+            for index, entry in enumerate(order):
+                if entry.get("id") == section_id:
+                    return index
+            raise ValueError(f"Section {section_id} is not part of this project")
+        
+        for operation in operations:
+            if operation.op == "add":
+                entry = {"title": operation.title, "content": operation.content}
+                position = len(order) if operation.position is None else min(operation.position, len(order))
+                order.insert(position, entry)
+            elif operation.op == "move":
+                entry = order.pop(index_of(operation.section_id))
+                order.insert(min(operation.position, len(order)), entry)
+            elif operation.op == "retitle":
+                order[index_of(operation.section_id)]["title"] = operation.title
+            elif operation.op == "delete":
+                order.pop(index_of(operation.section_id))
+        
+        kept = {entry["id"] for entry in order if "id" in entry}
+        deleted = [section_id for section_id in original if section_id not in kept]
+        changed = [
+            {"id": entry["id"], "title": entry["title"], "position": position}
+            for position, entry in enumerate(order)
+            if "id" in entry and original[entry["id"]] != (entry["title"], position)
+        ]
+        added = []
+        blobs = {}
+        for position, entry in enumerate(order):
+            if "id" in entry:
+                continue
+            row = {"project_id": project_id, "title": entry["title"], "content_hash": None, "position": position}
+            if entry["content"] is not None:
+                blob = ContentBlob.row(entry["content"])
+                blobs[blob["hash"]] = blob
+                row["content_hash"] = blob["hash"]
+            added.append(row)
+        
+        retitled = [
+            {"key": section_key(row["id"]), "title": row["title"]}
+            for row in changed
+            if original[row["id"]][0] != row["title"]
+        ]
+        
+        if deleted:
+            # Refinements, feedback and comments go with them via ON DELETE CASCADE
+            await db.execute(delete(Section).where(Section.id.in_(deleted)))
+            await db.execute(*SearchIndex.delete(db, [section_key(section_id) for section_id in deleted]))
+        if changed:
+            await db.execute(update(Section), changed)
+        if retitled:
+            await db.execute(*SearchIndex.retitle(db, retitled))
+        if blobs:
+            await db.execute(ContentBlob.upsert_statement(db.get_bind()), list(blobs.values()))
+        if added:
+            # render_nulls keeps rows with and without content in one executemany
+            new_ids = (await db.execute(
+                insert(Section).returning(Section.id, sort_by_parameter_order=True).execution_options(render_nulls=True),
+                added
+            )).scalars().all()
+            new_entries = [entry for entry in order if "id" not in entry]
+            await db.execute(*SearchIndex.upsert(db, [
+                SearchIndex.section_document(project_id, section_id, entry["title"], entry["content"])
+                for section_id, entry in zip(new_ids, new_entries)
+            ]))
+        await db.commit()
+        
+        return (await db.execute(
+            select(Section)
+            .where(Section.project_id == project_id)
+            .order_by(Section.position)
+            .execution_options(populate_existing=True)
+        )).scalars().all()
+    
+    @staticmethod
+    async def save_section_content(
+        db: AsyncSession,
+        section: Section,
+        content: str,
+        refinement_prompt: Optional[str] = None
+    ) -> Section:
+        """Store new section content, plus the refinement that produced it, in one transaction.
+        
+        Takes the section as already loaded (attached, or detached by
+        release_async_connection) and returns it updated, with no re-select
+        or refresh. Content identical to what the section already has (same
+        hash) is not written again.
+        """
+        changed = section.content_hash != content_hash(content)
+        if refinement_prompt is None and not changed:
+            return section
+        
+        db.add(section)
+        if refinement_prompt is not None:
+            db.add(Refinement(
+                section_id=section.id,
+                refinement_prompt=refinement_prompt,
+                refined_content=content
+            ))
+        section.content = content
+        if changed:
+            await db.execute(*SearchIndex.upsert(db, [_section_document(section)]))
+        await db.commit()
+        return section
+    
+    @staticmethod
+    async def save_generated_sections(db: AsyncSession, project_id: int, contents: Dict[int, str], status: str):
+        """Write generated content for many sections and the project status in one commit"""
+        if contents:
+            # Identical texts (e.g. cached AI output) share one blob
+            blobs, updates = _content_rows(contents)
+            await db.execute(ContentBlob.upsert_statement(db.get_bind()), blobs)
+            await db.execute(update(Section), updates)
+            await db.execute(*SearchIndex.upsert(db, _generated_documents(
+                (await db.execute(select(Section.id, Section.title).where(Section.id.in_(contents)))).all(),
+                project_id,
+                contents
+            )))
+        await db.execute(update(Project).where(Project.id == project_id).values(status=status))
+        await db.commit()
+    
+    @staticmethod
+    async def add_feedback(db: AsyncSession, section_id: int, user_id: int, feedback_type: str) -> dict:
+        """Record a user's like/dislike (one vote per user per section) and return the section's totals.
+        
+        The vote is a native upsert (insert, or flip an existing vote of the
+        other type) and the section's counters move by exactly what changed,
+        all in one transaction, so concurrent clicks can't double count.
+        """
+        insert_vote, flip_vote = _feedback_vote_statements(db, section_id, user_id, feedback_type)
+        inserted = (await db.execute(insert_vote)).first() is not None
+        flipped = not inserted and (await db.execute(flip_vote)).first() is not None
+        likes, dislikes = _feedback_delta(feedback_type, inserted, flipped)
+        
+        counts = (await db.execute(_feedback_count_statement(db, section_id, likes, dislikes))).one()
+        await db.commit()
+        return {
+            "section_id": section_id,
+            "like_count": counts.like_count,
+            "dislike_count": counts.dislike_count,
+            "user_feedback": feedback_type
+        }
+    
+    @staticmethod
+    async def get_feedback_counts(db: AsyncSession, project_id: int, user_id: int) -> List[dict]:
+        """Like/dislike totals per section, read from the counters rather than counted"""
+        rows = (await db.execute(_feedback_counts_statement(project_id, user_id))).all()
+        return [row._asdict() for row in rows]
+    
+    @staticmethod
+    async def add_comment(db: AsyncSession, section_id: int, user_id: int, comment_text: str) -> Comment:
+        """Add a comment to a section"""
+        comment = Comment(
+            section_id=section_id,
+            user_id=user_id,
+            comment_text=comment_text
+        )
+        db.add(comment)
+        await db.commit()
+        await db.refresh(comment)
+        return comment
+    
+    @staticmethod
+    async def delete_project(db: AsyncSession, project_id: int, user_id: int) -> bool:
+        """Delete a project"""
+        project = (await db.execute(select(Project).where(
+            Project.id == project_id,
+            Project.user_id == user_id
+        ))).scalars().first()
+        
+        if project:
+            section_ids = (await db.execute(select(Section.id).where(Section.project_id == project_id))).scalars().all()
+            await db.execute(*SearchIndex.delete(db, _project_keys(project_id, section_ids)))
+            await db.delete(project)
+            await db.commit()
+            return True
+        return False
@@ -0,0 +1,202 @@
+import asyncio
+import base64
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models import Refinement, RefinementArchive
+from app.services.blob_service import BlobService
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+def _entry(section_id: int, refinement_id: int, prompt: str, content: str, created_at, archived: bool) -> dict:
+    return {
+        "id": refinement_id,
+        "section_id": section_id,
+        "refinement_prompt": prompt,
+        "refined_content": content,
+        "created_at": created_at,
+        "archived": archived
+    }
+
+
+class RefinementService:
+    """Refinement history: paging through it and archiving the old part"""
+
+    @staticmethod
+    def encode_cursor(refinement_id: int) -> str:
+        """Opaque pagination cursor for the position after a refinement"""
+        return base64.urlsafe_b64encode(str(refinement_id).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> int:
+        """Inverse of encode_cursor; raises ValueError for a malformed cursor"""
+        try:
+            return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+    @staticmethod
+    async def get_history(
+        db: AsyncSession,
+        section_id: int,
+        limit: int,
+        before: Optional[int] = None
+    ) -> Tuple[List[dict], Optional[int]]:
+        """A page of a section's refinements, newest first, and the next page's cursor (or None).
+
+        Refinements still in the hot table come first; the page continues
+        into the archive once they run out. Only the rows on the page are
+        decompressed.
+        """
+        statement = select(Refinement).where(Refinement.section_id == section_id)
+        if before is not None:
+            statement = statement.where(Refinement.id < before)
+        rows = (await db.scalars(statement.order_by(Refinement.id.desc()).limit(limit + 1))).all()
+        entries = [
+            _entry(section_id, row.id, row.refinement_prompt, row.refined_content, row.created_at, False)
+            for row in rows
+        ]
+
+        missing = limit + 1 - len(entries)
+        if missing > 0:
+            # Archived refinements are all older than the hot ones; each archive row
+            # holds at least one, so `missing` rows are always enough
+            statement = select(RefinementArchive).where(RefinementArchive.section_id == section_id)
+            if before is not None:
+                statement = statement.where(RefinementArchive.first_refinement_id < before)
+            archives = await db.scalars(
+                statement.order_by(RefinementArchive.last_refinement_id.desc()).limit(missing)
+            )
+            for archive in archives:
+                for item in reversed(archive.entries):
+                    if before is not None and item["id"] >= before:
+                        continue
+                    created_at = item["created_at"] and datetime.fromisoformat(item["created_at"])
+                    entries.append(_entry(
+                        section_id, item["id"], item["refinement_prompt"], item["refined_content"], created_at, True
+                    ))
+                if len(entries) > limit:
+                    break
+
+        if len(entries) <= limit:
+            return entries, None
+        entries = entries[:limit]
+        return entries, entries[-1]["id"]
+
+    @staticmethod
+    def archive_refinements(db: Session, older_than: datetime, batch_size: int = 200) -> int:
+        """Move refinements created before ``older_than`` into refinement_archives.
+
+        Each section's old refinements are packed into archive rows of up to
+        ``batch_size``, one transaction per row. Safe to run from several
+        processes at once: a batch someone else archived first is skipped.
+        Returns the number of refinements archived.
+        """
+        section_ids = db.scalars(
+            select(Refinement.section_id).where(Refinement.created_at < older_than).distinct()
+        ).all()
+        archived = 0
+        for section_id in section_ids:
+            while True:
+                rows = db.scalars(
+                    select(Refinement)
+                    .where(Refinement.section_id == section_id, Refinement.created_at < older_than)
+                    .order_by(Refinement.id)
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+                ids = [row.id for row in rows]
+                removed = db.execute(
+                    delete(Refinement).where(Refinement.id.in_(ids)).execution_options(synchronize_session=False)
+                ).rowcount
+                if removed != len(ids):
+                    db.rollback()
+                    break
+                db.add(RefinementArchive(
+                    section_id=section_id,
+                    first_refinement_id=ids[0],
+                    last_refinement_id=ids[-1],
+                    refinement_count=len(rows),
+                    entries=[
+                        {
+                            "id": row.id,
+                            "refinement_prompt": row.refinement_prompt,
+                            "refined_content": row.refined_content,
+                            "created_at": row.created_at.isoformat() if row.created_at else None
+                        }
+                        for row in rows
+                    ]
+                ))
+                db.commit()
+                db.expunge_all()
+                archived += len(rows)
+        return archived
+
+
+class RefinementArchiver:
+    """Periodically moves refinements older than the retention period to the archive,
+    then deletes the content blobs that are no longer referenced"""
+
+    def __init__(self, session_factory=SessionLocal, retention_days: int = 30, interval: float = 3600.0):
+        self.session_factory = session_factory
+        self.retention_days = retention_days
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def archive(self) -> int:
+        if self.retention_days <= 0:
+            return 0
+        db = self.session_factory()
+        try:
+            cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+            return RefinementService.archive_refinements(db, cutoff, settings.REFINEMENT_ARCHIVE_BATCH_SIZE)
+        finally:
+            db.close()
+
+    def collect_garbage(self) -> int:
+        db = self.session_factory()
+        try:
+            unused_since = datetime.utcnow() - timedelta(hours=settings.CONTENT_BLOB_GC_AFTER_HOURS)
+            return BlobService.collect_garbage(db, unused_since)
+        finally:
+            db.close()
+
+    async def run(self):
+        while True:
+            try:
+                archived = await run_in_threadpool(self.archive)
+                if archived:
+                    logger.info("Archived %d refinement(s)", archived)
+                collected = await run_in_threadpool(self.collect_garbage)
+                if collected:
+                    logger.info("Deleted %d unused content blob(s)", collected)
+            except Exception:
+                logger.exception("Failed to archive refinements or delete unused content blobs")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+refinement_archiver = RefinementArchiver(
+    retention_days=settings.REFINEMENT_ARCHIVE_AFTER_DAYS,
+    interval=settings.REFINEMENT_ARCHIVE_INTERVAL_SECONDS
+)
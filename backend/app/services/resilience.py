@@ -0,0 +1,236 @@
+import asyncio
+import math
+import random
+import time
+from typing import Any, Awaitable, Callable
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# HTTP status codes worth retrying when reported by the upstream API
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class AIServiceError(Exception):
+    """Raised when an AI generation call fails"""
+
+
+class AIServiceUnavailable(AIServiceError):
+    """Raised when the AI upstream is rate limited or unhealthy and the call should be retried later"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Whether an upstream error is transient (quota, overload, timeout)"""
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    # google.api_core exceptions expose the HTTP status as ``code``
+    code = getattr(exc, "code", None)
+    try:
+        return int(code) in RETRYABLE_STATUS_CODES
+    except (TypeError, ValueError):
+        return False
+
+
+def estimate_tokens(prompt: str) -> int:
+    """Rough token estimate for quota accounting: ~4 characters per token plus the expected output"""
+    return len(prompt) // 4 + settings.AI_ESTIMATED_OUTPUT_TOKENS
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``capacity`` units per minute.
+
+    Units can be reserved ahead of time, which takes the level below zero;
+    the deficit is the queue that later callers wait behind.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available, counting earlier reservations"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Client-side limiter for requests per minute and tokens per minute.
+
+    Callers reserve capacity in arrival order and then sleep until their
+    reservation is due, so a caller's wait includes everyone queued ahead
+    of it; if that would exceed ``max_wait_seconds`` the call is rejected
+    with AIServiceUnavailable right away. A limit of 0 disables that bucket.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, max_wait_seconds: float):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_wait_seconds = max_wait_seconds
+
+    async def acquire(self, tokens: int):
+        # No await between checking and reserving, so no lock is needed
+        wait = max(
+            self.requests.wait_time(1) if self.requests else 0.0,
+            self.tokens.wait_time(tokens) if self.tokens else 0.0
+        )
+        if wait > self.max_wait_seconds:
+            raise AIServiceUnavailable("AI request quota exhausted, try again shortly", retry_after=wait)
+        if self.requests:
+            self.requests.consume(1)
+        if self.tokens:
+            self.tokens.consume(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def stats(self) -> dict:
+        return {
+            "requests_available": round(max(self.requests.tokens, 0.0), 2) if self.requests else None,
+            "tokens_available": round(max(self.tokens.tokens, 0.0)) if self.tokens else None
+        }
+
+
+class CircuitBreaker:
+    """Fail fast while the upstream is unhealthy.
+
+    Opens after ``failure_threshold`` consecutive transient failures, rejects
+    calls for ``reset_seconds``, then lets a single trial call through
+    (half-open) to decide whether to close again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def before_call(self):
+        if self.state == self.CLOSED:
+            return
+        remaining = self.reset_seconds - (time.monotonic() - self.opened_at)
+        if self.state == self.OPEN and remaining > 0:
+            raise AIServiceUnavailable("AI service is temporarily unavailable", retry_after=remaining)
+        if self._trial_in_flight:
+            raise AIServiceUnavailable("AI service is temporarily unavailable", retry_after=self.reset_seconds)
+        self.state = self.HALF_OPEN
+        self._trial_in_flight = True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """End a call that neither succeeded nor failed upstream (e.g. cancelled)"""
+        self._trial_in_flight = False
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures}
+
+
+class UpstreamGuard:
+    """Rate limiting, retry with jittered exponential backoff and circuit breaking around an upstream call"""
+
+    def __init__(
+        self,
+        limiter: RateLimiter,
+        breaker: CircuitBreaker,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float
+    ):
+        self.limiter = limiter
+        self.breaker = breaker
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (0-based) retry attempt"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    async def call(self, fn: Callable[[], Awaitable[Any]], estimated_tokens: int) -> Any:
+        for attempt in range(self.max_attempts):
+            self.breaker.before_call()
+            try:
+                await self.limiter.acquire(estimated_tokens)
+            except (AIServiceUnavailable, asyncio.CancelledError):
+                self.breaker.release()
+                raise
+
+            try:
+                result = await fn()
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    # The upstream answered; the request itself was bad
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                delay = self.backoff(attempt)
+                if self.breaker.state == CircuitBreaker.OPEN:
+                    raise AIServiceUnavailable(
+                        f"AI service is temporarily unavailable: {e}",
+                        retry_after=self.breaker.reset_seconds
+                    ) from e
+                if attempt + 1 >= self.max_attempts:
+                    raise AIServiceUnavailable(
+                        f"AI service is temporarily unavailable: {e}",
+                        retry_after=delay
+                    ) from e
+                await asyncio.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+
+    def stats(self) -> dict:
+        return {"circuit_breaker": self.breaker.stats(), "rate_limiter": self.limiter.stats()}
+
+
+upstream_guard = UpstreamGuard(
+    limiter=RateLimiter(
+        settings.AI_RATE_LIMIT_RPM,
+        settings.AI_RATE_LIMIT_TPM,
+        settings.AI_RATE_LIMIT_MAX_WAIT_SECONDS
+    ),
+    breaker=CircuitBreaker(
+        settings.AI_CIRCUIT_FAILURE_THRESHOLD,
+        settings.AI_CIRCUIT_RESET_SECONDS
+    ),
+    max_attempts=settings.AI_RETRY_MAX_ATTEMPTS,
+    base_delay=settings.AI_RETRY_BASE_DELAY_SECONDS,
+    max_delay=settings.AI_RETRY_MAX_DELAY_SECONDS
+)
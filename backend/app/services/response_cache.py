@@ -0,0 +1,107 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.config import get_settings
+from app.models import Project, Section
+
+settings = get_settings()
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag for a representation identified by ``parts`` (ids, versions, query parameters)"""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches ``etag`` (weak comparison, as RFC 9110 asks for GET)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """Bounded LRU of serialized JSON responses, each stored with the ETag it was built for.
+
+    A lookup only hits when the caller's current ETag (computed from the
+    database) equals the stored one, so an entry can never be served after
+    a write, even one made by another process or by a bulk UPDATE. Rows
+    flushed through this process's ORM also drop the affected entries right
+    away (see the mapper events below) so they don't hold memory until
+    evicted.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[str, bytes, dict]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, etag: str) -> Optional[Tuple[bytes, dict]]:
+        """(body, extra headers) cached for ``key`` if it was built for ``etag``"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != etag:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], entry[2]
+
+    def set(self, key: Hashable, etag: str, body: bytes, headers: Optional[dict] = None):
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (etag, body, headers or {})
+            self._size += len(body)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, kind: str, owner_id: int):
+        """Drop every entry whose key starts with (kind, owner_id)"""
+        with self._lock:
+            for key in [key for key in self._entries if key[:2] == (kind, owner_id)]:
+                self._drop(key)
+
+    def _drop(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[1])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+# Keys: ("project", project_id) for GET /projects/{id} and
+# ("projects", user_id, <query parameters>) for GET /projects
+project_response_cache = ResponseCache(
+    max_entries=settings.PROJECT_RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=settings.PROJECT_RESPONSE_CACHE_MAX_MB * 1024 * 1024
+)
+
+
+@event.listens_for(Project, "after_update")
+@event.listens_for(Project, "after_delete")
+def _invalidate_cached_project(mapper, connection, target: Project):
+    project_response_cache.invalidate("project", target.id)
+    project_response_cache.invalidate("projects", target.user_id)
+
+
+@event.listens_for(Section, "after_insert")
+@event.listens_for(Section, "after_update")
+@event.listens_for(Section, "after_delete")
+def _invalidate_cached_section(mapper, connection, target: Section):
+    project_response_cache.invalidate("project", target.project_id)
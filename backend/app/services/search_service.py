@@ -0,0 +1,194 @@
+import base64
+import html
+import re
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Search documents are keyed so one id space holds both kinds: a section's key
+# is its id, a project's (name + main topic) is minus its id
+# SQLite: an FTS5 table (rowid = key). PostgreSQL: a table with a generated
+# tsvector column and a GIN index. Both are created by migration 0006.
+SQLITE_TABLE = "search_index"
+POSTGRES_TABLE = "search_documents"
+
+# Highlight markers FTS5 / ts_headline put around matches; snippets are
+# HTML-escaped afterwards and the markers turned into <mark> tags
+_OPEN, _CLOSE = "\ue000", "\ue001"
+_TERM = re.compile(r"\w+", re.UNICODE)
+_SNIPPET_WORDS = 16
+
+
+def project_key(project_id: int) -> int:
+    return -project_id
+
+
+def section_key(section_id: int) -> int:
+    return section_id
+
+
+def _postgres(db) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _terms(query: str) -> List[str]:
+    return _TERM.findall(query)[:16]
+
+
+def _match_expression(terms: List[str], postgres: bool) -> str:
+    """Every term must match; the last one as a prefix, so results show up while typing"""
+    if postgres:
+        return " & ".join(terms[:-1] + [terms[-1] + ":*"])
+    quoted = ['"' + term.replace('"', '""') + '"' for term in terms]
+    return " ".join(quoted) + "*"
+
+
+def _highlight(snippet: Optional[str]) -> str:
+    return html.escape(snippet or "").replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>")
+
+
+class SearchIndex:
+    """Statements that keep the search index in step with projects and sections.
+
+    Each returns (statement, parameters) for ``db.execute`` (awaited on an
+    AsyncSession), so the sync and async services share them; they run in
+    the caller's transaction.
+    """
+
+    @staticmethod
+    def upsert(db, documents: List[dict]) -> Tuple:
+        """Add or replace documents given as {key, project_id, section_id, title, body}"""
+        rows = [{**document, "body": document["body"] or ""} for document in documents]
+        if _postgres(db):
+            statement = text(
+                f"INSERT INTO {POSTGRES_TABLE} (key, project_id, section_id, title, body) "
+                "VALUES (:key, :project_id, :section_id, :title, :body) "
+                "ON CONFLICT (key) DO UPDATE SET title = EXCLUDED.title, body = EXCLUDED.body"
+            )
+        else:
+            statement = text(
+                f"INSERT OR REPLACE INTO {SQLITE_TABLE} (rowid, project_id, section_id, title, body) "
+                "VALUES (:key, :project_id, :section_id, :title, :body)"
+            )
+        return statement, rows
+
+    @staticmethod
+    def retitle(db, titles: List[dict]) -> Tuple:
+        """Change the title of documents given as {key, title}, leaving the body alone"""
+        key = "key" if _postgres(db) else "rowid"
+        table = POSTGRES_TABLE if _postgres(db) else SQLITE_TABLE
+        return text(f"UPDATE {table} SET title = :title WHERE {key} = :key"), titles
+
+    @staticmethod
+    def delete(db, keys: Iterable[int]) -> Tuple:
+        key = "key" if _postgres(db) else "rowid"
+        table = POSTGRES_TABLE if _postgres(db) else SQLITE_TABLE
+        statement = text(f"DELETE FROM {table} WHERE {key} IN :keys").bindparams(bindparam("keys", expanding=True))
+        return statement, {"keys": list(keys)}
+
+    @staticmethod
+    def project_document(project_id: int, name: str, main_topic: str) -> dict:
+        return {
+            "key": project_key(project_id),
+            "project_id": project_id,
+            "section_id": None,
+            "title": name,
+            "body": main_topic
+        }
+
+    @staticmethod
+    def section_document(project_id: int, section_id: int, title: str, content: Optional[str]) -> dict:
+        return {
+            "key": section_key(section_id),
+            "project_id": project_id,
+            "section_id": section_id,
+            "title": title,
+            "body": content
+        }
+
+
+class SearchService:
+    """Ranked full-text search over a user's projects and sections"""
+
+    @staticmethod
+    def encode_cursor(offset: int) -> str:
+        """Opaque pagination cursor for the result after ``offset`` ones"""
+        return base64.urlsafe_b64encode(f"search|{offset}".encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> int:
+        """Inverse of encode_cursor; raises ValueError for a malformed cursor"""
+        try:
+            kind, offset = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            if kind != "search" or int(offset) < 0:
+                raise ValueError
+            return int(offset)
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+    @staticmethod
+    async def search(db: AsyncSession, user_id: int, query: str, limit: int, offset: int = 0) -> Tuple[List[dict], bool]:
+        """A page of matches, best first, and whether there are more.
+
+        Each match is a project (name / main topic) or a section (title /
+        content) with an HTML-safe snippet in which matches are wrapped in
+        <mark> tags. Only the snippets of the page are built.
+        """
+        terms = _terms(query)
+        if not terms:
+            return [], False
+
+        postgres = _postgres(db)
+        params = {
+            "query": _match_expression(terms, postgres),
+            "user_id": user_id,
+            "limit": limit + 1,
+            "offset": offset
+        }
+        if postgres:
+            statement = text(
+                "SELECT ranked.project_id, ranked.section_id, projects.name AS project_name, ranked.title, "
+                "ts_headline('english', CASE WHEN ranked.body <> '' THEN ranked.body ELSE ranked.title END, "
+                "ranked.query, :headline) AS snippet, ranked.score "
+                "FROM ("
+                "  SELECT d.key, d.project_id, d.section_id, d.title, d.body, q.query, "
+                "   ts_rank(d.document, q.query) AS score "
+                f"  FROM {POSTGRES_TABLE} d "
+                "   JOIN projects p ON p.id = d.project_id "
+                "   CROSS JOIN to_tsquery('english', :query) AS q(query) "
+                "   WHERE d.document @@ q.query AND p.user_id = :user_id "
+                "   ORDER BY score DESC, d.key LIMIT :limit OFFSET :offset"
+                ") ranked JOIN projects ON projects.id = ranked.project_id "
+                "ORDER BY ranked.score DESC, ranked.key"
+            )
+            params["headline"] = (
+                f"StartSel={_OPEN}, StopSel={_CLOSE}, MaxFragments=1, "
+                f"MaxWords={_SNIPPET_WORDS}, MinWords={_SNIPPET_WORDS // 2}"
+            )
+        else:
+            # bm25 is lower-is-better; title matches weigh more than body matches
+            statement = text(
+                f"SELECT {SQLITE_TABLE}.project_id, {SQLITE_TABLE}.section_id, projects.name AS project_name, "
+                f"{SQLITE_TABLE}.title, "
+                f"snippet({SQLITE_TABLE}, -1, :open, :close, '…', {_SNIPPET_WORDS}) AS snippet, "
+                f"-bm25({SQLITE_TABLE}, 4.0, 1.0) AS score "
+                f"FROM {SQLITE_TABLE} JOIN projects ON projects.id = {SQLITE_TABLE}.project_id "
+                f"WHERE {SQLITE_TABLE} MATCH :query AND projects.user_id = :user_id "
+                f"ORDER BY score DESC, {SQLITE_TABLE}.rowid LIMIT :limit OFFSET :offset"
+            )
+            params.update(open=_OPEN, close=_CLOSE)
+
+        rows = (await db.execute(statement, params)).all()
+        results = [
+            {
+                "project_id": row.project_id,
+                "section_id": row.section_id,
+                "project_name": row.project_name,
+                "title": row.title,
+                "snippet": _highlight(row.snippet),
+                "score": float(row.score)
+            }
+            for row in rows[:limit]
+        ]
+        return results, len(rows) > limit
@@ -0,0 +1,217 @@
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# Words that change a prompt's wording far more than its meaning
+_STOPWORDS = frozenset("a an and as at by for from in into of on or the to with".split())
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def text_features(text: str) -> List[str]:
+    """Word and character trigram features of a text.
+
+    Case, punctuation, stopwords and word order don't affect the feature
+    bag, so "AI in healthcare" and "Healthcare AI" get identical features.
+    """
+    features = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        features.append("w:" + token)
+        padded = f" {token} "
+        features.extend("c:" + padded[i:i + 3] for i in range(len(padded) - 2))
+    return features
+
+
+class _Partition:
+    """Term-frequency rows, expiry times and document frequencies for one partition, one matrix per field.
+
+    Rows live in preallocated matrices that double when full, so adding an
+    entry doesn't copy them; removing one moves the last row into its slot.
+    """
+
+    def __init__(self, field_count: int, dimensions: int, capacity: int = 16):
+        import numpy as np
+
+        self.entry_ids: List[int] = []
+        self._positions: Dict[int, int] = {}
+        self.rows = [np.zeros((capacity, dimensions), dtype=np.float32) for _ in range(field_count)]
+        self.expires_at = np.zeros(capacity, dtype=np.float64)
+        self.document_frequency = [np.zeros(dimensions, dtype=np.float32) for _ in range(field_count)]
+
+    def _grow(self):
+        import numpy as np
+
+        capacity = len(self.expires_at) * 2
+        for field, rows in enumerate(self.rows):
+            grown = np.zeros((capacity, rows.shape[1]), dtype=np.float32)
+            grown[:len(rows)] = rows
+            self.rows[field] = grown
+        expires_at = np.zeros(capacity, dtype=np.float64)
+        expires_at[:len(self.expires_at)] = self.expires_at
+        self.expires_at = expires_at
+
+    def add(self, entry_id: int, vectors: list, expires_at: float):
+        index = len(self.entry_ids)
+        if index == len(self.expires_at):
+            self._grow()
+        for field, vector in enumerate(vectors):
+            self.rows[field][index] = vector
+            self.document_frequency[field] += vector > 0
+        self.expires_at[index] = expires_at
+        self.entry_ids.append(entry_id)
+        self._positions[entry_id] = index
+
+    def remove(self, entry_id: int):
+        index = self._positions.pop(entry_id)
+        last = len(self.entry_ids) - 1
+        for field, rows in enumerate(self.rows):
+            self.document_frequency[field] -= rows[index] > 0
+            rows[index] = rows[last]
+        self.expires_at[index] = self.expires_at[last]
+        moved = self.entry_ids.pop()
+        if index != last:
+            self.entry_ids[index] = moved
+            self._positions[moved] = index
+
+    def expired(self, now: float) -> List[int]:
+        import numpy as np
+
+        return [self.entry_ids[index] for index in np.flatnonzero(self.expires_at[:len(self.entry_ids)] <= now)]
+
+    def scores(self, vectors: list):
+        """Cosine similarity of every row to the query, taking the lowest across fields"""
+        import numpy as np
+
+        count = len(self.entry_ids)
+        combined = np.ones(count, dtype=np.float32)
+        for field, query in enumerate(vectors):
+            idf = np.log((1.0 + count) / (1.0 + self.document_frequency[field])) + 1.0
+            weighted_rows = self.rows[field][:count] * idf
+            weighted_query = query * idf
+            norms = np.linalg.norm(weighted_rows, axis=1) * np.linalg.norm(weighted_query)
+            dots = weighted_rows @ weighted_query
+            similarity = np.divide(dots, norms, out=np.zeros(count, dtype=np.float32), where=norms > 0)
+            combined = np.minimum(combined, similarity)
+        return combined
+
+
+class SimilarityCache:
+    """In-memory near-duplicate lookup of AI responses.
+
+    Prompts are described by one or more short text fields (e.g. topic and
+    section title) rather than the full prompt, so template text doesn't
+    dominate the comparison. Each field becomes a hashed n-gram TF-IDF
+    vector; a cached response is reused when every field's cosine
+    similarity reaches ``threshold``. Entries are only compared within the
+    same partition (operation, document type, ...), expire after
+    ``ttl_seconds`` and are evicted least recently used past ``max_entries``.
+    """
+
+    def __init__(self, threshold: float, max_entries: int, dimensions: int, ttl_seconds: int, enabled: bool = True):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.dimensions = dimensions
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._partitions: Dict[Hashable, _Partition] = {}
+        # entry id -> (partition key, response text), oldest access first
+        self._entries: "OrderedDict[int, Tuple[Hashable, str]]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _vectorize(self, text: str):
+        import numpy as np
+
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in text_features(text):
+            vector[zlib.crc32(feature.encode("utf-8")) % self.dimensions] += 1.0
+        # Sublinear term frequency so a repeated word doesn't swamp the rest
+        return np.log1p(vector)
+
+    def _remove(self, entry_id: int):
+        partition_key, _ = self._entries.pop(entry_id)
+        partition = self._partitions[partition_key]
+        partition.remove(entry_id)
+        if not partition.entry_ids:
+            del self._partitions[partition_key]
+
+    def get(self, partition_key: Hashable, fields: Tuple[str, ...]) -> Optional[str]:
+        """Cached response for the most similar fields in the partition, if above the threshold"""
+        if not self.enabled:
+            return None
+        vectors = [self._vectorize(field) for field in fields]
+        with self._lock:
+            partition = self._partitions.get(partition_key)
+            if partition is not None:
+                # Expired entries are dropped before ranking so they can't hide a live match
+                for entry_id in partition.expired(time.time()):
+                    self._remove(entry_id)
+                partition = self._partitions.get(partition_key)
+            if partition is None:
+                self.misses += 1
+                return None
+
+            scores = partition.scores(vectors)
+            best = int(scores.argmax())
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            entry_id = partition.entry_ids[best]
+            _, response = self._entries[entry_id]
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            return response
+
+    def set(self, partition_key: Hashable, fields: Tuple[str, ...], response: str):
+        """Index a response under its fields"""
+        if not self.enabled or not response:
+            return
+        vectors = [self._vectorize(field) for field in fields]
+        with self._lock:
+            partition = self._partitions.get(partition_key)
+            if partition is None:
+                partition = self._partitions[partition_key] = _Partition(len(fields), self.dimensions)
+
+            entry_id = self._next_id
+            self._next_id += 1
+            partition.add(entry_id, vectors, time.time() + self.ttl_seconds)
+            self._entries[entry_id] = (partition_key, response)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._partitions.clear()
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "partitions": len(self._partitions),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+
+similarity_cache = SimilarityCache(
+    threshold=settings.AI_SIMILARITY_THRESHOLD,
+    max_entries=settings.AI_SIMILARITY_MAX_ENTRIES,
+    dimensions=settings.AI_SIMILARITY_DIMENSIONS,
+    ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+    enabled=settings.AI_SIMILARITY_CACHE_ENABLED
+)
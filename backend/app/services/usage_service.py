@@ -0,0 +1,248 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models import AIUsageRecord, Project, User
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Records kept in memory while the database is unreachable; the oldest are dropped first
+MAX_PENDING_RECORDS = 10000
+
+# (user_id, project_id) that AI calls made in the current request or job are billed to
+_usage_scope: ContextVar[Tuple[Optional[int], Optional[int]]] = ContextVar(
+    "ai_usage_scope", default=(None, None)
+)
+
+
+def set_usage_scope(user_id: Optional[int], project_id: Optional[int] = None):
+    """Attribute AI calls made from the current request or job to a user and project.
+
+    Tasks started afterwards (concurrent section generation, a shared
+    single-flight call) inherit the scope.
+    """
+    _usage_scope.set((user_id, project_id))
+
+
+def estimate_cost(prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD cost of a token count at the configured prices"""
+    return (
+        prompt_tokens * settings.AI_INPUT_TOKEN_PRICE_PER_MILLION
+        + completion_tokens * settings.AI_OUTPUT_TOKEN_PRICE_PER_MILLION
+    ) / 1_000_000
+
+
+def percentile(sorted_values: List[int], fraction: float) -> Optional[int]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def _without_deleted_references(db, rows: List[dict]) -> List[dict]:
+    """Copies of usage rows with user / project ids that no longer exist set to None"""
+    user_ids = {row["user_id"] for row in rows if row["user_id"] is not None}
+    project_ids = {row["project_id"] for row in rows if row["project_id"] is not None}
+    users = set(db.scalars(select(User.id).where(User.id.in_(user_ids)))) if user_ids else set()
+    projects = set(db.scalars(select(Project.id).where(Project.id.in_(project_ids)))) if project_ids else set()
+    return [
+        {
+            **row,
+            "user_id": row["user_id"] if row["user_id"] in users else None,
+            "project_id": row["project_id"] if row["project_id"] in projects else None
+        }
+        for row in rows
+    ]
+
+
+class UsageRecorder:
+    """Buffers one row per upstream AI call and writes them in batches.
+
+    Recording never touches the database, so it adds nothing to call
+    latency; ``flush`` (run periodically by ``run`` and on shutdown) does
+    the insert.
+    """
+
+    def __init__(self, session_factory=SessionLocal, enabled: bool = True):
+        self.session_factory = session_factory
+        self.enabled = enabled
+        self._pending = deque(maxlen=MAX_PENDING_RECORDS)
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(
+        self,
+        operation: str,
+        model: str,
+        started: float,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        error: Optional[Exception] = None
+    ):
+        """Record a finished call; ``started`` is its ``time.perf_counter()`` start"""
+        if not self.enabled:
+            return
+        user_id, project_id = _usage_scope.get()
+        row = {
+            "user_id": user_id,
+            "project_id": project_id,
+            "operation": operation,
+            "model": model,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "latency_ms": int((time.perf_counter() - started) * 1000),
+            "outcome": "error" if error is not None else "success",
+            "error": f"{type(error).__name__}: {error}"[:255] if error is not None else None,
+            "created_at": datetime.utcnow()
+        }
+        with self._lock:
+            self._pending.append(row)
+
+    async def track(self, operation: str, model: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``fn`` (one upstream call returning an LLMResponse) and record it"""
+        started = time.perf_counter()
+        try:
+            response = await fn()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.record(operation, model, started, error=e)
+            raise
+        self.record(operation, model, started, response.prompt_tokens, response.completion_tokens)
+        return response
+
+    def flush(self) -> int:
+        """Write buffered records; on failure they are put back for the next flush"""
+        with self._lock:
+            rows = list(self._pending)
+            self._pending.clear()
+        if not rows:
+            return 0
+
+        db = self.session_factory()
+        try:
+            try:
+                db.execute(insert(AIUsageRecord), rows)
+            except IntegrityError:
+                # A user or project was deleted after the call was recorded; keep
+                # the record the way ON DELETE SET NULL would have
+                db.rollback()
+                rows = _without_deleted_references(db, rows)
+                db.execute(insert(AIUsageRecord), rows)
+            db.commit()
+            return len(rows)
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._pending.extendleft(reversed(rows))
+            raise
+        finally:
+            db.close()
+
+    async def run(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await run_in_threadpool(self.flush)
+            except Exception:
+                logger.exception("Failed to write AI usage records")
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.ensure_future(self.run(settings.AI_USAGE_FLUSH_SECONDS))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await run_in_threadpool(self.flush)
+
+
+class UsageService:
+    """Aggregate reports over recorded AI calls"""
+
+    @staticmethod
+    async def _records(db: AsyncSession, user_id: int, days: int) -> list:
+        since = datetime.utcnow() - timedelta(days=days)
+        result = await db.execute(select(
+            AIUsageRecord.created_at,
+            AIUsageRecord.operation,
+            AIUsageRecord.project_id,
+            AIUsageRecord.latency_ms,
+            AIUsageRecord.prompt_tokens,
+            AIUsageRecord.completion_tokens,
+            AIUsageRecord.outcome
+        ).where(
+            AIUsageRecord.user_id == user_id,
+            AIUsageRecord.created_at >= since
+        ).order_by(AIUsageRecord.created_at))
+        return result.all()
+
+    @staticmethod
+    def _summarize(records: list) -> dict:
+        latencies = sorted(record.latency_ms for record in records)
+        prompt_tokens = sum(record.prompt_tokens or 0 for record in records)
+        completion_tokens = sum(record.completion_tokens or 0 for record in records)
+        return {
+            "calls": len(records),
+            "errors": sum(1 for record in records if record.outcome == "error"),
+            "latency_p50_ms": percentile(latencies, 0.50),
+            "latency_p95_ms": percentile(latencies, 0.95),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "estimated_cost_usd": round(estimate_cost(prompt_tokens, completion_tokens), 6)
+        }
+
+    @staticmethod
+    async def daily_summary(db: AsyncSession, user_id: int, days: int = 7) -> List[dict]:
+        """Calls, latency percentiles and tokens per operation per day"""
+        groups = {}
+        for record in await UsageService._records(db, user_id, days):
+            groups.setdefault((record.created_at.date(), record.operation), []).append(record)
+
+        return [
+            {"day": day.isoformat(), "operation": operation, **UsageService._summarize(records)}
+            for (day, operation), records in sorted(groups.items())
+        ]
+
+    @staticmethod
+    async def project_summary(db: AsyncSession, user_id: int, days: int = 30) -> List[dict]:
+        """Usage per project, most tokens first"""
+        groups = {}
+        for record in await UsageService._records(db, user_id, days):
+            groups.setdefault(record.project_id, []).append(record)
+
+        names = dict((await db.execute(
+            select(Project.id, Project.name).where(
+                Project.id.in_([project_id for project_id in groups if project_id is not None])
+            )
+        )).all())
+        summaries = [
+            {
+                "project_id": project_id,
+                "project_name": names.get(project_id),
+                **UsageService._summarize(records)
+            }
+            for project_id, records in groups.items()
+        ]
+        summaries.sort(key=lambda item: item["prompt_tokens"] + item["completion_tokens"], reverse=True)
+        return summaries
+
+
+usage_recorder = UsageRecorder(enabled=settings.AI_USAGE_TRACKING_ENABLED)
@@ -0,0 +1,107 @@
+import importlib.abc
+import sys
+import time
+from typing import List, Optional, Tuple
+
+
+class _TimedLoader:
+    """Loader proxy that times ``exec_module`` for the module it loads"""
+
+    def __init__(self, loader, timer: "ImportTimer"):
+        self._loader = loader
+        self._timer = timer
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def exec_module(self, module):
+        self._timer._depth += 1
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            # Hand the real loader back so later introspection sees the usual type
+            module.__loader__ = self._loader
+            if module.__spec__ is not None:
+                module.__spec__.loader = self._loader
+            self._timer._depth -= 1
+            self._timer.records.append(
+                (module.__name__, (time.perf_counter() - started) * 1000, self._timer._depth)
+            )
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """Records cumulative import time of every module imported while installed.
+
+    Only the outermost import of a chain is reported, so the report lists
+    what each top-level import (e.g. a router module) costs in total.
+    """
+
+    def __init__(self):
+        self.records: List[Tuple[str, float, int]] = []
+        self.started = time.perf_counter()
+        self._depth = 0
+        self._finding = set()
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname in self._finding:
+            return None
+        self._finding.add(fullname)
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimedLoader(spec.loader, self)
+                    return spec
+            return None
+        finally:
+            self._finding.discard(fullname)
+
+    def top_level(self, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Outermost imports, slowest first"""
+        outermost = sorted(
+            ((name, elapsed) for name, elapsed, depth in self.records if depth == 0),
+            key=lambda item: item[1],
+            reverse=True
+        )
+        return outermost[:limit] if limit else outermost
+
+    def report(self, limit: int = 10) -> str:
+        total = (time.perf_counter() - self.started) * 1000
+        lines = [f"⏱  App imported in {total:.0f} ms ({len(self.records)} modules); slowest imports:"]
+        for name, elapsed in self.top_level(limit):
+            lines.append(f"   {elapsed:8.1f} ms  {name}")
+        return "\n".join(lines)
+
+
+def warm_up() -> List[Tuple[str, float]]:
+    """Load the AI client and document libraries ahead of the first request that needs them.
+
+    Blocking; meant to run in a worker thread once the server is accepting
+    connections. Returns (step, milliseconds) pairs.
+    """
+    from app.services.llm_backends import get_llm_backend
+
+    timings = []
+    steps = [
+        ("AI backend", get_llm_backend),
+        ("python-docx", lambda: __import__("docx")),
+        ("python-pptx", lambda: __import__("pptx")),
+    ]
+    for step, load in steps:
+        started = time.perf_counter()
+        load()
+        timings.append((step, (time.perf_counter() - started) * 1000))
+    return timings
@@ -0,0 +1,107 @@
+"""SQLite write throughput benchmark: default settings vs. the tuned profile.
+
+Runs the same write workload (save a refinement and update the section,
+one commit each, like the refine endpoint) against a scratch database file
+twice: once with SQLite's defaults and once with the pragmas from
+app.database.sqlite_pragmas(). Nothing touches DATABASE_URL's database.
+
+    python db_benchmark.py --threads 8 --writes 500
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, create_db_engine
+from app.models import Project, Refinement, Section, User
+
+
+def seed(session_factory, sections: int) -> list:
+    db = session_factory()
+    try:
+        user = User(email="bench@example.com", password_hash="x")
+        project = Project(user=user, name="bench", document_type="docx", main_topic="bench")
+        project.sections = [Section(title=f"Section {i}", position=i, content="") for i in range(sections)]
+        db.add(project)
+        db.commit()
+        return [section.id for section in project.sections]
+    finally:
+        db.close()
+
+
+def run(tuned: bool, threads: int, writes: int) -> dict:
+    directory = tempfile.mkdtemp(prefix="db-benchmark-")
+    url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    engine = create_db_engine(url, tuned=tuned)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    section_ids = seed(session_factory, threads)
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def writer(section_id: int):
+        db = session_factory()
+        try:
+            section = db.get(Section, section_id)
+            for i in range(writes):
+                content = f"Refined content {i} " * 40
+                start = time.perf_counter()
+                try:
+                    db.add(Refinement(section_id=section_id, refinement_prompt="shorter", refined_content=content))
+                    db.commit()
+                    section.content = content
+                    db.commit()
+                except OperationalError as e:
+                    db.rollback()
+                    with lock:
+                        errors.append(str(e.orig))
+                    continue
+                with lock:
+                    latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            db.close()
+
+    workers = [threading.Thread(target=writer, args=(section_id,)) for section_id in section_ids]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+
+    latencies.sort()
+    return {
+        "profile": "tuned" if tuned else "default",
+        "writes_per_second": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+        "errors": len(errors),
+        "seconds": elapsed
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8, help="concurrent writers, one section each")
+    parser.add_argument("--writes", type=int, default=200, help="refine-style writes per thread")
+    args = parser.parse_args()
+
+    print(f"{args.threads} writer threads x {args.writes} writes (refinement insert + section update)")
+    results = [run(tuned, args.threads, args.writes) for tuned in (False, True)]
+    for result in results:
+        print(
+            f"{result['profile']:>8}: {result['writes_per_second']:8.1f} writes/s  "
+            f"p50 {result['p50_ms']:6.2f} ms  p95 {result['p95_ms']:7.2f} ms  "
+            f"errors {result['errors']}  ({result['seconds']:.1f} s)"
+        )
+    baseline, tuned = results
+    if baseline["writes_per_second"]:
+        print(f"speedup: {tuned['writes_per_second'] / baseline['writes_per_second']:.1f}x")
@@ -1,12 +1,11 @@
-from app.database import Base, engine
-from app.models import User, Project, Section, Refinement, Feedback, Comment
+from app.database import init_db, schema_revisions
 
 def init_database():
-    """Create all database tables"""
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("✓ Database tables created successfully!")
-    print("✓ Database file: ai_document.db")
+    """Create or upgrade database tables by running the Alembic migrations"""
+    print("Applying database migrations...")
+    init_db()
+    current, _ = schema_revisions()
+    print(f"✓ Database schema is at revision {current}")
 
 if __name__ == "__main__":
     init_database()
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""Concurrency load test for the AI routes.
+
+Start the API with the fake backend so no Gemini key or network is needed:
+
+    AI_BACKEND=fake AI_FAKE_LATENCY_MS=1500 uvicorn app.main:app
+
+then run:
+
+    python load_test.py --url http://localhost:8000 --concurrency 200 --requests 1000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+async def get_token(client: httpx.AsyncClient) -> str:
+    email = f"load-{uuid.uuid4().hex[:8]}@example.com"
+    password = "load-test-password"
+    await client.post("/auth/register", json={"email": email, "password": password})
+    response = await client.post("/auth/login", data={"username": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run(url: str, concurrency: int, total: int, distinct_topics: int):
+    limits = httpx.Limits(max_connections=concurrency + 10, max_keepalive_connections=concurrency + 10)
+    async with httpx.AsyncClient(base_url=url, timeout=120, limits=limits) as client:
+        token = await get_token(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        statuses = {}
+
+        async def one(i: int):
+            body = {
+                "topic": f"Load test topic {i % distinct_topics}",
+                "document_type": "docx",
+                "num_sections": 5,
+                "bypass_cache": True
+            }
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.post("/ai/generate-outline", json=body, headers=headers)
+                    outcome = response.status_code
+                except httpx.TransportError as e:
+                    outcome = type(e).__name__
+                latencies.append(time.perf_counter() - start)
+                statuses[outcome] = statuses.get(outcome, 0) + 1
+
+        async def probe_health():
+            # /health latency while the AI routes are saturated
+            samples = []
+            while len(latencies) < total:
+                start = time.perf_counter()
+                await client.get("/health")
+                samples.append(time.perf_counter() - start)
+                await asyncio.sleep(0.1)
+            return samples
+
+        start = time.perf_counter()
+        health_task = asyncio.ensure_future(probe_health())
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+        health = await health_task
+
+    latencies.sort()
+    print(f"requests:     {total} ({concurrency} concurrent) in {elapsed:.2f}s -> {total / elapsed:.1f} req/s")
+    print(f"status codes: {statuses}")
+    print(f"latency p50:  {statistics.median(latencies) * 1000:.0f} ms")
+    print(f"latency p95:  {latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f} ms")
+    if health:
+        print(f"/health max:  {max(health) * 1000:.0f} ms over {len(health)} probes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--distinct-topics", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.concurrency, args.requests, args.distinct_topics))
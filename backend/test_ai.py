@@ -1,16 +1,17 @@
-from app.services.ai_service import AIService
+import asyncio
+from app.services.ai_service import AsyncAIService
 
-def test_ai():
+async def test_ai():
     print("Testing Gemini AI Integration...\n")
     
-    ai = AIService()
+    ai = AsyncAIService()
     
     # Test 1: Generate outline
     print("=" * 50)
     print("Test 1: Generate Document Outline")
     print("=" * 50)
     topic = "Artificial Intelligence in Healthcare"
-    outline = ai.generate_document_outline(topic, "docx", 5)
+    outline = await ai.generate_document_outline(topic, "docx", 5)
     print(f"Topic: {topic}")
     print("\nGenerated Outline:")
     for i, title in enumerate(outline, 1):
@@ -22,7 +23,7 @@ def test_ai():
     print("=" * 50)
     if outline:
         section_title = outline[0]
-        content = ai.generate_section_content(topic, section_title, "docx")
+        content = await ai.generate_section_content(topic, section_title, "docx")
         print(f"Section: {section_title}")
         print(f"\nGenerated Content:\n{content}")
     
@@ -31,4 +32,4 @@ def test_ai():
     print("=" * 50)
 
 if __name__ == "__main__":
-    test_ai()
\ No newline at end of file
+    asyncio.run(test_ai())
\ No newline at end of file
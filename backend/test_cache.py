@@ -0,0 +1,107 @@
+"""AI cache smoke check: run with `python test_cache.py`.
+
+Uses the offline fake backend and a throwaway SQLite database, so no API
+key or network access is needed.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'cache.db')}"
+
+from app.database import init_db
+from app.services.ai_service import AsyncAIService
+from app.services.cache_service import PromptCache
+from app.services.llm_backends import FakeBackend, LLMStream
+from app.services.similarity_cache import SimilarityCache
+
+
+class CountingBackend(FakeBackend):
+    """Fake backend that counts upstream calls and can return nothing, like a blocked response"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+        self.blank = False
+
+    async def generate_async(self, prompt, generation_config=None):
+        self.calls += 1
+        response = await super().generate_async(prompt, generation_config)
+        if self.blank:
+            response.text = ""
+        return response
+
+    async def open_stream(self, prompt):
+        self.calls += 1
+        if not self.blank:
+            return await super().open_stream(prompt)
+        stream = LLMStream()
+
+        async def chunks():
+            return
+            yield
+
+        stream.chunks = chunks()
+        return stream
+
+
+async def check_prompt_cache():
+    backend = CountingBackend()
+    ai = AsyncAIService(backend)
+
+    content = await ai.generate_section_content("Cache check topic", "First section", "docx")
+    await ai.generate_section_content("Cache check topic", "First section", "docx")
+    assert content and backend.calls == 1, f"repeat prompt made {backend.calls} upstream calls"
+    print("✓ Repeated prompt served from cache")
+
+    backend.blank = True
+    streamed = "".join([chunk async for chunk in ai.stream_section_content("Blocked topic", "Blocked", "docx")])
+    assert streamed == ""
+    backend.blank = False
+    calls = backend.calls
+    content = await ai.generate_section_content("Blocked topic", "Blocked", "docx")
+    assert content and backend.calls == calls + 1, "empty stream was cached"
+    print("✓ Empty responses are not cached")
+
+
+def check_db_eviction():
+    cache = PromptCache(ttl_seconds=3600, max_entries=10, db_max_entries=40, evict_every=5)
+    for i in range(100):
+        cache.set(f"eviction-check:{i}", "fake", f"value {i}")
+    cache.clear_memory()
+    kept = sum(cache.get(f"eviction-check:{i}") is not None for i in range(100))
+    assert kept <= 40 + cache.evict_every, f"{kept} rows kept, cap is 40"
+    assert cache.get("eviction-check:99") == "value 99", "newest entry was evicted"
+    print(f"✓ DB tier capped ({kept} of 100 rows kept)")
+
+
+def check_similarity_expiry():
+    cache = SimilarityCache(threshold=0.5, max_entries=100, dimensions=512, ttl_seconds=3600)
+    cache.set("p", ("AI in healthcare",), "expired")
+    cache.set("p", ("healthcare AI systems",), "fresh")
+    partition = cache._partitions["p"]
+    partition.expires_at[0] = time.time() - 1
+    assert cache.get("p", ("AI in healthcare",)) == "fresh", "expired best match hid a fresh one"
+    assert cache.stats()["entries"] == 1, "expired entry was not evicted"
+    print("✓ Expired similarity entries are skipped and evicted")
+
+
+def test_cache():
+    print("=" * 50)
+    print("Testing AI Caches...")
+    print("=" * 50)
+
+    init_db()
+    asyncio.run(check_prompt_cache())
+    check_db_eviction()
+    check_similarity_expiry()
+
+
+if __name__ == "__main__":
+    try:
+        test_cache()
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        sys.exit(1)
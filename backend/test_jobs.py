@@ -0,0 +1,123 @@
+"""Generation job queue smoke check: run with `python test_jobs.py`.
+
+Runs the worker pool against a throwaway SQLite database with stub job
+handlers, and makes the first outcome write and heartbeat fail the way a
+locked database would.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'jobs.db')}"
+
+from app.database import AsyncSessionLocal, SessionLocal, async_engine, init_db
+from app.models import GenerationJob, User
+from app.services import job_service
+from app.services.job_service import AsyncJobService, JobService, JobWorkerPool
+
+
+def fail_first_calls(name: str, count: int):
+    original = getattr(JobService, name)
+    remaining = [count]
+
+    def wrapper(db, *args):
+        if remaining[0]:
+            remaining[0] -= 1
+            raise RuntimeError("database is locked")
+        return original(db, *args)
+
+    setattr(JobService, name, staticmethod(wrapper))
+
+
+async def quick_job(job_id: int, user_id: int, payload: dict) -> dict:
+    await asyncio.sleep(0.3)
+    return {"ok": True}
+
+
+async def slow_job(job_id: int, user_id: int, payload: dict) -> dict:
+    await asyncio.sleep(30)
+    return {}
+
+
+async def enqueue(user_id: int, count: int) -> list:
+    async with AsyncSessionLocal() as db:
+        return [(await AsyncJobService.enqueue(db, user_id, "generate_all", {})).id for _ in range(count)]
+
+
+def statuses(job_ids: list) -> list:
+    db = SessionLocal()
+    try:
+        return [db.get(GenerationJob, job_id).status for job_id in job_ids]
+    finally:
+        db.close()
+
+
+async def check_workers(user_id: int):
+    job_service.JOB_HANDLERS["generate_all"] = quick_job
+    fail_first_calls("complete", 1)
+    fail_first_calls("heartbeat", 2)
+    pool = JobWorkerPool(worker_count=2, poll_interval=0.1, heartbeat_interval=0.1, stale_after=60)
+    await pool.start()
+    try:
+        job_ids = await enqueue(user_id, 4)
+        pool.notify()
+        await asyncio.sleep(2)
+        alive = sum(not task.done() for task in pool._tasks)
+        assert alive == len(pool._tasks), "a worker died after a database error"
+        done = statuses(job_ids).count("succeeded")
+        # The job whose completion write failed stays running until the reaper recovers it
+        assert done == 3, f"{done} of 4 jobs succeeded, expected 3"
+        print("✓ Workers survive failed outcome and heartbeat writes")
+    finally:
+        await pool.stop()
+
+
+async def check_shutdown_requeue(user_id: int):
+    job_service.JOB_HANDLERS["generate_all"] = slow_job
+    pool = JobWorkerPool(worker_count=1, poll_interval=0.1, heartbeat_interval=1, stale_after=60)
+    await pool.start()
+    job_ids = await enqueue(user_id, 1)
+    pool.notify()
+    await asyncio.sleep(0.5)
+    assert statuses(job_ids) == ["running"]
+    await pool.stop()
+    assert statuses(job_ids) == ["queued"], "interrupted job was not requeued"
+    print("✓ Jobs interrupted by shutdown go back to the queue")
+
+
+async def run_checks(user_id: int):
+    try:
+        await check_workers(user_id)
+        await check_shutdown_requeue(user_id)
+    finally:
+        # aiosqlite connection threads would otherwise keep the process alive
+        await async_engine.dispose()
+
+
+def test_jobs():
+    print("=" * 50)
+    print("Testing Generation Jobs...")
+    print("=" * 50)
+
+    init_db()
+    db = SessionLocal()
+    try:
+        user = User(email="jobs@example.com", password_hash="x")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+    finally:
+        db.close()
+
+    # The injected failures are logged with tracebacks; they are expected here
+    job_service.logger.disabled = True
+    asyncio.run(run_checks(user_id))
+
+
+if __name__ == "__main__":
+    try:
+        test_jobs()
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        sys.exit(1)
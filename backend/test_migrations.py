@@ -0,0 +1,153 @@
+"""Migration smoke check: run with `python test_migrations.py`.
+
+Builds a throwaway SQLite database the way the app did before migrations
+existed (create_all of the original six tables), upgrades it with init_db,
+then does the same for an empty database. Both must end up at the head
+revision with every model table present and no schema differences.
+"""
+import os
+import sys
+import tempfile
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "migrations.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from datetime import datetime
+
+from sqlalchemy import (
+    CheckConstraint, Column, DateTime, ForeignKey, Integer, MetaData, String, Table, Text,
+    create_engine, inspect
+)
+
+from app.database import Base, SessionLocal, _alembic_config, engine, init_db, schema_revisions
+from app.models import Section
+
+# The schema as the app's create_all built it before migrations were added.
+# Frozen on purpose: revision 0001 must match it, not the current models.
+baseline = MetaData()
+Table(
+    "users", baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("email", String, unique=True, nullable=False, index=True),
+    Column("password_hash", String, nullable=False),
+    Column("full_name", String),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+Table(
+    "projects", baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("name", String, nullable=False),
+    Column("document_type", String, nullable=False),
+    Column("main_topic", Text, nullable=False),
+    Column("status", String),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    CheckConstraint("document_type IN ('docx', 'pptx')", name="check_document_type"),
+    CheckConstraint("status IN ('draft', 'generating', 'completed')", name="check_status"),
+)
+Table(
+    "sections", baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("project_id", Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False),
+    Column("title", String, nullable=False),
+    Column("position", Integer, nullable=False),
+    Column("content", Text),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+Table(
+    "refinements", baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("section_id", Integer, ForeignKey("sections.id", ondelete="CASCADE"), nullable=False),
+    Column("refinement_prompt", Text, nullable=False),
+    Column("refined_content", Text, nullable=False),
+    Column("created_at", DateTime),
+)
+Table(
+    "feedback", baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("section_id", Integer, ForeignKey("sections.id", ondelete="CASCADE"), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("feedback_type", String, nullable=False),
+    Column("created_at", DateTime),
+    CheckConstraint("feedback_type IN ('like', 'dislike')", name="check_feedback_type"),
+)
+Table(
+    "comments", baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("section_id", Integer, ForeignKey("sections.id", ondelete="CASCADE"), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("comment_text", Text, nullable=False),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+
+
+def build_baseline_db():
+    baseline_engine = create_engine(os.environ["DATABASE_URL"])
+    try:
+        baseline.create_all(baseline_engine)
+        now = datetime.utcnow()
+        with baseline_engine.begin() as connection:
+            connection.execute(baseline.tables["users"].insert(), {
+                "id": 1, "email": "a@example.com", "password_hash": "x", "created_at": now, "updated_at": now
+            })
+            connection.execute(baseline.tables["projects"].insert(), {
+                "id": 1, "user_id": 1, "name": "p", "document_type": "docx", "main_topic": "t",
+                "status": "draft", "created_at": now, "updated_at": now
+            })
+            connection.execute(baseline.tables["sections"].insert(), {
+                "id": 1, "project_id": 1, "title": "s", "position": 0, "content": "kept",
+                "created_at": now, "updated_at": now
+            })
+    finally:
+        baseline_engine.dispose()
+
+
+def check_schema(label: str):
+    from alembic import command
+
+    current, heads = schema_revisions()
+    assert current in heads, f"{label}: at revision {current}, expected {heads}"
+    missing = set(Base.metadata.tables) - set(inspect(engine).get_table_names())
+    assert not missing, f"{label}: missing tables {sorted(missing)}"
+    # Raises if the migrated schema differs from the models
+    command.check(_alembic_config())
+    print(f"✓ {label}: revision {current}, all {len(Base.metadata.tables)} model tables present")
+
+
+def reset_db():
+    engine.dispose()
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+
+
+def test_migrations():
+    print("=" * 50)
+    print("Testing Migrations...")
+    print("=" * 50)
+
+    build_baseline_db()
+    init_db()
+    check_schema("Pre-migration database")
+    db = SessionLocal()
+    try:
+        assert db.get(Section, 1).content == "kept", "section content lost in migration"
+        print("✓ Existing section content survived the upgrade")
+    finally:
+        db.close()
+
+    reset_db()
+    init_db()
+    check_schema("Empty database")
+    reset_db()
+
+
+if __name__ == "__main__":
+    try:
+        test_migrations()
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        sys.exit(1)
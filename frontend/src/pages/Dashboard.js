@@ -3,9 +3,12 @@ import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
 import { projectsAPI } from '../services/api';
 
+const PAGE_SIZE = 24;
+
 function Dashboard() {
   const [projects, setProjects] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
   const { user, logout } = useAuth();
   const navigate = useNavigate();
 
@@ -13,10 +16,13 @@ function Dashboard() {
     loadProjects();
   }, []);
 
-  const loadProjects = async () => {
+  const loadProjects = async (cursor = null) => {
     try {
-      const response = await projectsAPI.getAll();
-      setProjects(response.data);
+      const params = { summary: true, limit: PAGE_SIZE };
+      if (cursor) params.cursor = cursor;
+      const response = await projectsAPI.getAll(params);
+      setProjects((previous) => (cursor ? [...previous, ...response.data] : response.data));
+      setNextCursor(response.headers['x-next-cursor'] || null);
     } catch (error) {
       console.error('Error loading projects:', error);
     } finally {
@@ -114,7 +120,7 @@ function Dashboard() {
                 <div style={styles.projectInfo}>
                   <div style={styles.infoItem}>
                     <span style={styles.infoIcon}>📑</span>
-                    <span>{project.sections?.length || 0} sections</span>
+                    <span>{project.generated_section_count}/{project.section_count} sections</span>
                   </div>
                   <div style={styles.infoItem}>
                     <span style={styles.infoIcon}>📅</span>
@@ -140,6 +146,14 @@ function Dashboard() {
             ))}
           </div>
         )}
+
+        {!loading && nextCursor && (
+          <div style={styles.loadMoreContainer}>
+            <button onClick={() => loadProjects(nextCursor)} style={styles.loadMoreBtn}>
+              Load more
+            </button>
+          </div>
+        )}
       </div>
       
       <style>{keyframes}</style>
@@ -319,6 +333,20 @@ const styles = {
     transition: 'transform 0.2s ease, box-shadow 0.2s ease',
     animation: 'fadeInUp 0.6s ease-out 0.2s backwards',
   },
+  loadMoreContainer: {
+    textAlign: 'center',
+    marginTop: '30px',
+  },
+  loadMoreBtn: {
+    padding: '12px 28px',
+    background: 'white',
+    color: '#9370DB',
+    border: '2px solid #9370DB',
+    borderRadius: '12px',
+    fontSize: '15px',
+    cursor: 'pointer',
+    fontWeight: '600',
+  },
   loadingContainer: {
     textAlign: 'center',
     padding: '60px',
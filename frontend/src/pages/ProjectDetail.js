@@ -28,11 +28,21 @@ function ProjectDetail() {
     }
   };
 
+  // Swap in a section returned by a write instead of reloading the whole project
+  const replaceSection = (updated) => {
+    setProject((current) => ({
+      ...current,
+      sections: current.sections.map((section) =>
+        section.id === updated.id ? updated : section
+      ),
+    }));
+  };
+
   const handleGenerateContent = async (sectionId) => {
     setGeneratingSection(sectionId);
     try {
-      await aiAPI.generateSectionContent(projectId, sectionId);
-      await loadProject(); // Reload to get updated content
+      const response = await aiAPI.generateSectionContent(projectId, sectionId);
+      replaceSection(response.data.section);
       alert('✅ Content generated!');
     } catch (error) {
       alert('Failed to generate content');
@@ -49,8 +59,8 @@ function ProjectDetail() {
 
     setRefiningSection(sectionId);
     try {
-      await aiAPI.refineContent(sectionId, refinementPrompt);
-      await loadProject();
+      const response = await aiAPI.refineContent(sectionId, refinementPrompt);
+      replaceSection(response.data.section);
       setRefinementPrompt('');
       alert('✅ Content refined!');
     } catch (error) {
@@ -37,12 +37,28 @@ export const authAPI = {
 
 // Projects API
 export const projectsAPI = {
-  getAll: () => api.get('/projects'),
+  getAll: (params) => api.get('/projects', { params }),
   
   getById: (id) => api.get(`/projects/${id}`),
   
   create: (projectData) => api.post('/projects', projectData),
   
+  // operations: [{ op: 'add' | 'move' | 'retitle' | 'delete', section_id, title, content, position }]
+  updateSections: (id, operations) => api.patch(`/projects/${id}/sections`, { operations }),
+  
+  // feedbackType: 'like' | 'dislike'
+  addFeedback: (id, sectionId, feedbackType) =>
+    api.post(`/projects/${id}/sections/${sectionId}/feedback`, { feedback_type: feedbackType }),
+  
+  getFeedback: (id) => api.get(`/projects/${id}/feedback`),
+  
+  // Ranked matches with <mark>-highlighted snippets; pass X-Next-Cursor back as cursor
+  search: (q, params) => api.get('/projects/search', { params: { q, ...params } }),
+  
+  // Newest first; pass the X-Next-Cursor header of the previous page as cursor
+  getRefinements: (id, sectionId, params) =>
+    api.get(`/projects/${id}/sections/${sectionId}/refinements`, { params }),
+  
   delete: (id) => api.delete(`/projects/${id}`),
 };
 